@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Layanan prediksi IKU tanpa browser (headless), berdampingan dengan app.py.
+#   python api.py --workers 4 --port 8000
+# Endpoint:
+#   GET  /health          -> status & versi model aktif (registry)
+#   POST /predict         -> satu baris JSON {fitur: nilai}
+#   POST /predict/batch   -> JSON {"rows": [...]} atau CSV (format angka Indonesia);
+#                            respons JSON menyertakan skor drift (PSI/KS) per fitur
+#   GET  /metrics         -> metrik timing format Prometheus (isi jika AIROLYTICS_PROFILE=1)
+
+import argparse
+import contextlib
+import io
+import os
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+import streamlit.logger
+
+# Cache Streamlit dipakai tanpa runtime: sembunyikan peringatan "No runtime found"
+streamlit.logger.set_log_level("error")
+
+from utils.helpers import (clean_name, features, file_signature, load_compiled_model, read_csv_id,
+                           rf_predict_batch, iku_categories)
+from utils.registry import active_model
+from utils.drift import check_batch, flag_labels, out_of_range, training_stats
+from utils import perf
+
+MAX_BATCH_ROWS = int(os.environ.get("AIROLYTICS_MAX_BATCH_ROWS", 100_000))
+DRIFT_MIN_ROWS = 20   # di bawah ini PSI/KS tidak bermakna
+
+# ==============================
+# 1. Skoring
+# ==============================
+def score_frame(df: pd.DataFrame, model) -> pd.DataFrame:
+    """Prediksi + kategori + daftar fitur di luar range untuk tiap baris"""
+    pred = rf_predict_batch(df, load_compiled_model(model.model_path))
+    flags = out_of_range(df, training_stats(model)).to_numpy()
+    return pd.DataFrame({
+        "Prediksi_IKU": pred,
+        "Kategori": np.asarray(iku_categories(pred), dtype=object),
+        "Di_Luar_Range": flag_labels(flags),
+    }, index=df.index)
+
+def drift_summary(df: pd.DataFrame, model) -> list:
+    """PSI/KS per fitur batch ini terhadap data latih versi model (kosong untuk batch kecil)"""
+    if len(df) < DRIFT_MIN_ROWS:
+        return []
+    summary = check_batch(df, training_stats(model)).summary.reset_index()
+    return summary.drop(columns="N").to_dict(orient="records")
+
+def _csv_schema(body: str) -> dict:
+    # Fitur dibaca sebagai angka; kolom lain (Provinsi, Tahun, ID skenario, ...) diteruskan
+    # apa adanya ke respons CSV, seperti --keep di score.py
+    header = pd.read_csv(io.StringIO(body), nrows=0).columns
+    schema = {clean_name(col): "string" for col in header}
+    schema.update({col: "float64" for col in features})
+    return schema
+
+def _frame_from_json(payload) -> pd.DataFrame:
+    rows = payload.get("rows") if isinstance(payload, dict) else payload
+    if not isinstance(rows, list):
+        raise ValueError("Body harus berupa list baris atau {'rows': [...]}")
+    return pd.DataFrame.from_records(rows)
+
+def _error(error, status: int = 422) -> JSONResponse:
+    message = error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+    return JSONResponse({"error": message}, status_code=status)
+
+# ==============================
+# 2. Endpoint
+# ==============================
+async def health(request: Request) -> JSONResponse:
+    model = active_model()
+    return JSONResponse({"status": "ok", "model": model.version,
+                         "model_version": file_signature(model.model_path)[2][:16],
+                         "features": features, "pid": os.getpid()})
+
+async def metrics(request: Request) -> Response:
+    return Response(perf.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+async def predict(request: Request) -> JSONResponse:
+    try:
+        payload = await request.json()
+        df = pd.DataFrame([payload])
+        result = score_frame(df, active_model()).iloc[0]
+    except (ValueError, KeyError, TypeError) as e:
+        return _error(e)
+    return JSONResponse({
+        "prediksi_iku": float(result["Prediksi_IKU"]),
+        "kategori": result["Kategori"],
+        "di_luar_range": [c for c in result["Di_Luar_Range"].split(";") if c],
+    })
+
+async def predict_batch(request: Request) -> Response:
+    content_type = request.headers.get("content-type", "")
+    is_csv = content_type.startswith("text/csv")
+    try:
+        if is_csv:
+            body = (await request.body()).decode("utf-8")
+            df = read_csv_id(io.StringIO(body), schema=_csv_schema(body))
+        else:
+            df = _frame_from_json(await request.json())
+        if len(df) > MAX_BATCH_ROWS:
+            return _error(f"Maksimal {MAX_BATCH_ROWS} baris per request", 413)
+        # Versi model di-resolve sekali per request: prediksi, range & drift dari versi yang sama
+        model = active_model()
+        scored = score_frame(df, model)
+    except (ValueError, KeyError, TypeError) as e:
+        return _error(e)
+
+    if is_csv:
+        out = pd.concat([df, scored], axis=1).to_csv(index=False)
+        return Response(out, media_type="text/csv")
+    return JSONResponse({"predictions": scored.to_dict(orient="records"), "drift": drift_summary(df, model)})
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Model dimuat sekali per worker saat startup, bukan saat request pertama
+    load_compiled_model()
+    yield
+
+app = Starlette(
+    routes=[
+        Route("/health", health, methods=["GET"]),
+        Route("/predict", predict, methods=["POST"]),
+        Route("/predict/batch", predict_batch, methods=["POST"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Layanan prediksi IKU (headless)")
+    parser.add_argument("--host", default=os.environ.get("AIROLYTICS_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("AIROLYTICS_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("AIROLYTICS_WORKERS", 1)))
+    args = parser.parse_args()
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
@@ -3,8 +3,12 @@
 
 import streamlit as st
 from modules.sidebar import show_sidebar
+from utils import perf
 from tabs import tab1, tab2, tab3
 
+# Rekaman timing per rerun (hanya jika AIROLYTICS_PROFILE=1)
+perf.start_run()
+
 # ==============================
 # Config halaman
 # ==============================
@@ -28,36 +32,29 @@ st.markdown("""
     padding-left: 3rem !important;
     padding-right: 3rem !important;
 }
-
-/* Styling untuk tab navigasi */
-button[role="tab"] {
-    margin-right: 1.5rem;
-    font-size: 18px;
-    font-weight: 1000;  /* tebal */
-}
 </style>
 """, unsafe_allow_html=True)
 
-# --- Tampilkan sidebar di semua tab ---
+# --- Tampilkan sidebar di semua halaman ---
 show_sidebar()
 
 # ==============================
-# Tabs di atas halaman
+# Navigasi di atas halaman
 # ==============================
-tabs = st.tabs([
-    "Tentang Proyek",
-    "Demo Prediksi Interaktif",
-    "Evaluasi & Visualisasi"
-])
-
-# ----- Tab 1 -----
-with tabs[0]:
-    tab1.show_tab()
-
-# ----- Tab 2 -----
-with tabs[1]:
-    tab2.show_tab()
-
-# ----- Tab 3 -----
-with tabs[2]:
-    tab3.show_tab()
+# Hanya halaman aktif yang dieksekusi tiap rerun (st.tabs menjalankan ketiganya).
+# Widget di halaman tersembunyi tidak dirender, jadi state ber-key "tabN_*"
+# ditulis ulang agar tidak dibuang Streamlit saat pindah halaman.
+for key in list(st.session_state.keys()):
+    if str(key).startswith(("tab1_", "tab2_", "tab3_")):
+        st.session_state[key] = st.session_state[key]
+
+pages = [
+    st.Page(tab1.show_tab, title="Tentang Proyek", url_path="tentang", default=True),
+    st.Page(tab2.show_tab, title="Demo Prediksi Interaktif", url_path="demo"),
+    st.Page(tab3.show_tab, title="Evaluasi & Visualisasi", url_path="evaluasi"),
+]
+st.navigation(pages, position="top").run()
+
+# Panel timing developer di sidebar (setelah halaman selesai dirender)
+perf.show_panel()
+
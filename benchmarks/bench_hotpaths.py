@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmark jalur panas dashboard: parsing CSV, prediksi RF (satu & batch),
+# loop semua provinsi tab2, fuzzy matching provinsi, build peta folium, dan
+# waktu rerun show_tab() tiap halaman (headless via AppTest).
+#   python benchmarks/bench_hotpaths.py --scales 34 500 10000 --output hotpaths.json
+# Simpan JSON per commit lalu bandingkan (mis. `diff` / jq) untuk menangkap regresi.
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import streamlit as st
+import streamlit.logger
+streamlit.logger.set_log_level("error")
+
+from bench_startup import cold_start, import_time
+from utils.helpers import (features, input_ranges, read_csv_id, load_latih, load_hot, load_model,
+                           load_compiled_model, rf_predict, rf_predict_batch)
+
+# ==============================
+# Timer
+# ==============================
+def timed(fn, repeat: int = 5, warmup: int = 1) -> dict:
+    """Statistik waktu (detik) dari `repeat` pemanggilan setelah `warmup`"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {
+        "repeat": repeat,
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+    }
+
+def clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+# ==============================
+# Dataset sintetis (provinsi x tahun)
+# ==============================
+def make_panel(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Baris df_latih+df_hot diulang sampai `n_rows`, fitur diberi noise dalam input_ranges"""
+    rng = np.random.default_rng(seed)
+    base = pd.concat([load_latih(), load_hot()], ignore_index=True)
+    reps = int(np.ceil(n_rows / len(base)))
+    df = pd.concat([base] * reps, ignore_index=True).iloc[:n_rows].copy()
+    df["Tahun"] = df["Tahun"] + (np.arange(n_rows) // len(base)) * 5
+    for col in features:
+        lo, hi = input_ranges[col]
+        noise = rng.normal(1.0, 0.05, n_rows)
+        df[col] = np.clip(df[col].to_numpy() * noise, lo, hi)
+    return df
+
+def write_csv_id(df: pd.DataFrame, path: Path):
+    """Tulis CSV dengan format sumber data (desimal koma)"""
+    df.to_csv(path, index=False, sep=",", decimal=",")
+
+# ==============================
+# Kasus benchmark
+# ==============================
+def bench_csv(df: pd.DataFrame, tmp_dir: Path) -> dict:
+    path = tmp_dir / f"panel_{len(df)}.csv"
+    write_csv_id(df, path)
+    return {
+        "read_csv_id": timed(lambda: read_csv_id(path)),
+        "pandas_read_csv_raw": timed(lambda: pd.read_csv(path)),
+    }
+
+def bench_predict(df: pd.DataFrame) -> dict:
+    model, compiled = load_model(), load_compiled_model()
+    row = df.iloc[0]
+    X_df = df[features]
+    return {
+        "rf_predict_single": timed(lambda: rf_predict(row), repeat=200),
+        "rf_predict_batch_compiled": timed(lambda: rf_predict_batch(df, compiled)),
+        "rf_predict_batch_sklearn": timed(lambda: model.predict(X_df)),
+        "predict_trees_compiled": timed(lambda: compiled.predict_trees(X_df.to_numpy())),
+    }
+
+def bench_tab2_loop(df: pd.DataFrame) -> dict:
+    """Pola lama tab2 (rf_predict per provinsi) vs satu panggilan batch"""
+    rows = [row for _, row in df.iterrows()]
+    return {
+        "rf_predict_loop": timed(lambda: [rf_predict(r) for r in rows], repeat=3),
+        "rf_predict_batch": timed(lambda: rf_predict_batch(df), repeat=3),
+    }
+
+def bench_hot_results() -> dict:
+    """Hasil df_hot: cache memori kosong (disk tetap hangat) vs cache hangat"""
+    from utils.results import hot_results
+
+    def cold_memory():
+        clear_caches()
+        hot_results()
+
+    return {
+        "hot_results_cold_memory": timed(cold_memory, repeat=3),
+        "hot_results_warm": timed(hot_results, repeat=50),
+    }
+
+def bench_fuzzy(df: pd.DataFrame, tmp_dir: Path) -> dict:
+    """Nama dikenal (lookup alias) vs nama baru dengan salah ketik (fuzzy)"""
+    import utils.provinsi as provinsi
+    alias_path = provinsi.ALIAS_PATH
+    provinsi.ALIAS_PATH = tmp_dir / "provinsi_alias.json"   # jangan sentuh cache alias asli
+    try:
+        return _bench_fuzzy(provinsi, df)
+    finally:
+        # Benchmark berikutnya di proses yang sama memakai path & index alias asli lagi
+        provinsi.ALIAS_PATH = alias_path
+        clear_caches()
+
+def _bench_fuzzy(provinsi, df: pd.DataFrame) -> dict:
+    known = df["Provinsi"].tolist()
+    rng = np.random.default_rng(1)
+    def typo(name: str) -> str:
+        i = int(rng.integers(1, max(len(name) - 1, 2)))
+        return name[:i] + name[i + 1:] + " X"
+    unknown = sorted({typo(n) for n in known})
+
+    def resolve_unknown():
+        clear_caches()
+        provinsi.ALIAS_PATH.unlink(missing_ok=True)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            provinsi.resolve_provinsi(unknown)
+
+    fuzzy = timed(resolve_unknown, repeat=3, warmup=0)
+    return {
+        "resolve_known": timed(lambda: provinsi.resolve_provinsi(known)),
+        "resolve_unknown_fuzzy": {**fuzzy, "n_unique": len(unknown)},
+        "add_kode_provinsi": timed(lambda: provinsi.add_kode_provinsi(df)),
+    }
+
+def bench_map() -> dict:
+    from utils.geometry import load_topojson
+    from utils.choropleth import MAP_ZOOM, build_choropleth_html
+    from utils.results import hot_results
+
+    df_pred = hot_results().frame()
+    topology = load_topojson(MAP_ZOOM)
+    html = build_choropleth_html(df_pred, topology)
+    return {
+        "build_choropleth_html": timed(lambda: build_choropleth_html(df_pred, topology), repeat=3),
+        "html_bytes": len(html.encode()),
+    }
+
+def _page(mod: str, base_dir: str):
+    # Dijalankan oleh AppTest sebagai skrip terpisah: hanya boleh memakai argumennya
+    import sys
+    sys.path.insert(0, base_dir)
+    import importlib
+    importlib.import_module(f"tabs.{mod}").show_tab()
+
+def bench_tabs(reruns: int) -> dict:
+    """Waktu run pertama & rerun show_tab() tiap halaman"""
+    from streamlit.testing.v1 import AppTest
+    report = {}
+    for mod in ("tab1", "tab2", "tab3"):
+        at = AppTest.from_function(_page, args=(mod, str(BASE_DIR)), default_timeout=300)
+        t0 = time.perf_counter()
+        at.run()
+        first = time.perf_counter() - t0
+        samples = []
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - t0)
+        report[mod] = {
+            "first_run_s": first,
+            "rerun_median_s": statistics.median(samples),
+            "rerun_min_s": min(samples),
+            "exceptions": [e.value for e in at.exception],
+        }
+    return report
+
+def git_commit() -> str:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                          capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark jalur panas dashboard")
+    parser.add_argument("--scales", type=int, nargs="+", default=[34, 500, 10_000],
+                        help="jumlah baris provinsi-tahun sintetis")
+    parser.add_argument("--reruns", type=int, default=5, help="jumlah rerun show_tab per halaman")
+    parser.add_argument("--skip-startup", action="store_true", help="lewati cold start & import")
+    parser.add_argument("--skip-tabs", action="store_true", help="lewati rerun AppTest")
+    parser.add_argument("--output", type=Path, default=None, help="simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "scales": {},
+    }
+    if not args.skip_startup:
+        report["startup"] = {"cold_start": cold_start(), "import_utils_helpers": import_time("utils.helpers")}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        for n_rows in args.scales:
+            df = make_panel(n_rows)
+            report["scales"][n_rows] = {
+                "csv": bench_csv(df, tmp_dir),
+                "predict": bench_predict(df),
+                "tab2_loop": bench_tab2_loop(df),
+                "fuzzy": bench_fuzzy(df, tmp_dir),
+            }
+        report["hot_results"] = bench_hot_results()
+        report["map"] = bench_map()
+
+    if not args.skip_tabs:
+        report["tabs"] = bench_tabs(args.reruns)
+
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+
+if __name__ == "__main__":
+    main()
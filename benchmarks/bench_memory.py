@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmark memori resident per proses saat memuat model:
+#   joblib  : rf_augmentasi.pkl via joblib.load (objek sklearn, salinan privat per proses)
+#   copy    : artefak forest terkompilasi dimuat ke memori (np.load tanpa mmap)
+#   mmap    : artefak forest terkompilasi dengan mmap_mode="r" (dibagi lewat page cache)
+# Tiap mode menjalankan --procs proses bersamaan; semua diukur saat masih hidup,
+# jadi PSS (RSS dibagi rata untuk halaman bersama) menunjukkan efek berbagi.
+#   python benchmarks/bench_memory.py --procs 4 --output memory.json
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+MODES = ("baseline", "joblib", "copy", "mmap")
+
+CHILD_SNIPPET = """
+import json, sys
+import streamlit.logger
+streamlit.logger.set_log_level("error")
+from utils.helpers import (CACHE_DIR, features, file_signature, load_hot, resolve_model_path,
+                           load_compiled_model, rf_predict_batch)
+from utils.forest import load_compiled
+
+mode = sys.argv[1]
+model_path = resolve_model_path()
+df = load_hot()
+if mode == "joblib":
+    import joblib
+    model = joblib.load(model_path)
+    model.predict(df[features])
+elif mode in ("copy", "mmap"):
+    load_compiled_model(model_path)   # pastikan artefak sudah ada di disk
+    path = CACHE_DIR / f"forest.{file_signature(model_path)[2][:16]}"
+    model = load_compiled(path, mmap=(mode == "mmap"))
+    rf_predict_batch(df, model)
+
+def read_kb(path, keys):
+    out = {}
+    with open(path) as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in keys:
+                out[key] = int(rest.split()[0])
+    return out
+
+status = read_kb("/proc/self/status", ("VmRSS", "RssAnon", "RssFile", "RssShmem"))
+rollup = read_kb("/proc/self/smaps_rollup", ("Pss", "Shared_Clean", "Private_Clean", "Private_Dirty"))
+print(json.dumps({**status, **rollup}), flush=True)
+sys.stdin.read()   # tetap hidup sampai semua proses diukur
+"""
+
+def measure(mode: str, procs: int) -> dict:
+    """Jalankan `procs` proses bersamaan dengan mode yang sama; ringkas memori per proses (KiB)"""
+    children = [
+        subprocess.Popen([sys.executable, "-c", CHILD_SNIPPET, mode], cwd=BASE_DIR,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for _ in range(procs)
+    ]
+    samples = []
+    try:
+        for child in children:
+            line = child.stdout.readline()
+            if not line:
+                raise RuntimeError(f"Proses mode '{mode}' gagal (exit {child.wait()})")
+            samples.append(json.loads(line))
+    finally:
+        for child in children:
+            child.stdin.close()
+            child.wait()
+    keys = samples[0].keys()
+    return {"procs": procs, **{f"{k}_kb": statistics.median(s[k] for s in samples) for k in keys}}
+
+def main():
+    parser = argparse.ArgumentParser(description="Memori resident per proses: joblib vs artefak mmap")
+    parser.add_argument("--procs", type=int, default=4, help="jumlah proses bersamaan per mode")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--output", type=Path, default=None, help="simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    report = {mode: measure(mode, args.procs) for mode in args.modes}
+    base = report.get("baseline")
+    if base:
+        # Tambahan di atas proses yang hanya mengimpor utils.helpers + membaca df_hot
+        for mode, row in report.items():
+            row["model_pss_kb"] = row["Pss_kb"] - base["Pss_kb"]
+            row["model_anon_kb"] = row["RssAnon_kb"] - base["RssAnon_kb"]
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmark layanan headless (api.py) vs jalur Streamlit (rf_predict per klik).
+#   python benchmarks/bench_service.py --workers 1 2 4 --rows 1000
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import streamlit.logger
+streamlit.logger.set_log_level("error")
+
+from utils.helpers import features, load_hot, rf_predict, rf_predict_batch
+
+# ==============================
+# Data uji: baris df_hot diulang sampai `n` baris
+# ==============================
+def make_rows(n: int) -> pd.DataFrame:
+    df = load_hot()[features]
+    reps = int(np.ceil(n / len(df)))
+    return pd.concat([df] * reps, ignore_index=True).iloc[:n]
+
+def _post(url: str, payload) -> dict:
+    req = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                 headers={"content-type": "application/json"})
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"{url}/health").read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server {url} tidak siap dalam {timeout} detik")
+
+# ==============================
+# Jalur Streamlit (in-process)
+# ==============================
+def bench_streamlit(rows: pd.DataFrame) -> dict:
+    t0 = time.perf_counter()
+    for _, row in rows.iterrows():
+        rf_predict(row)
+    per_row = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rf_predict_batch(rows)
+    batch = time.perf_counter() - t0
+    return {
+        "rows": len(rows),
+        "rf_predict_per_row_ms": per_row / len(rows) * 1e3,
+        "rf_predict_loop_rows_per_s": len(rows) / per_row,
+        "rf_predict_batch_rows_per_s": len(rows) / batch,
+    }
+
+# ==============================
+# Jalur HTTP
+# ==============================
+def bench_service(url: str, rows: pd.DataFrame, n_single: int, concurrency: int) -> dict:
+    records = rows.to_dict(orient="records")
+    singles = records[:n_single]
+
+    latencies = []
+    def one(record):
+        t0 = time.perf_counter()
+        _post(f"{url}/predict", record)
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, singles))
+    single_wall = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    _post(f"{url}/predict/batch", {"rows": records})
+    batch_wall = time.perf_counter() - t0
+    return {
+        "single_p50_ms": float(np.percentile(latencies, 50) * 1e3),
+        "single_p95_ms": float(np.percentile(latencies, 95) * 1e3),
+        "single_requests_per_s": len(singles) / single_wall,
+        "batch_rows_per_s": len(records) / batch_wall,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark api.py vs jalur Streamlit")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--single", type=int, default=200, help="jumlah request /predict")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", type=Path, default=None, help="simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    report = {"streamlit": bench_streamlit(rows), "service": {}}
+
+    url = f"http://127.0.0.1:{args.port}"
+    for n_workers in args.workers:
+        proc = subprocess.Popen(
+            [sys.executable, "api.py", "--port", str(args.port), "--workers", str(n_workers)],
+            cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_ready(url)
+            report["service"][n_workers] = bench_service(url, rows, args.single, args.concurrency)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmark cold start: waktu import per module & render pertama app.py,
+# masing-masing diukur di proses Python baru.
+#   python benchmarks/bench_startup.py --output startup.json
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Modul proyek + library berat yang ingin dipantau
+MODULES = [
+    "utils.helpers", "utils.provinsi", "utils.results", "utils.geometry", "utils.choropleth",
+    "modules.sidebar", "tabs.tab1", "tabs.tab2", "tabs.tab3",
+    "streamlit", "pandas", "numpy", "joblib", "sklearn.ensemble",
+    "plotly.express", "plotly.graph_objects", "folium", "rapidfuzz",
+]
+
+COLD_START_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=300)
+at.run()
+print(json.dumps({"seconds": time.perf_counter() - t0, "exceptions": [e.value for e in at.exception]}))
+"""
+
+def import_time(module: str) -> dict:
+    """Waktu import (detik) sebuah modul di interpreter baru, via -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1]}
+    # Baris terakhir dengan nama modul = kumulatif modul itu sendiri
+    for line in reversed(proc.stderr.splitlines()):
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+            self_us, cumulative_us = (int(x) for x in line.split(":", 1)[1].split("|")[:2])
+            return {"self_s": self_us / 1e6, "cumulative_s": cumulative_us / 1e6}
+    return {"error": "modul tidak ditemukan di output importtime"}
+
+def cold_start() -> dict:
+    """Waktu dari proses baru sampai render pertama app.py (halaman default)"""
+    proc = subprocess.run([sys.executable, "-c", COLD_START_SNIPPET],
+                          cwd=BASE_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold start & import per modul")
+    parser.add_argument("--output", type=Path, default=None, help="simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "cold_start": cold_start(),
+        "imports": {module: import_time(module) for module in MODULES},
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Skoring massal CSV (provinsi/kabupaten x tahun x skenario) tanpa dashboard.
+#   python score.py skenario.csv --output hasil.parquet --workers 4
+#   python score.py skenario.csv --output hasil.csv --workers 1 2 4 8   # rows/s per jumlah worker
+#   python score.py skenario.csv --workers 4 --engine compiled   # artefak mmap, RSS per worker kecil
+# File dibaca per potongan baris, di-parse (format angka Indonesia) dan diprediksi
+# di worker, lalu hasilnya ditulis berurutan; memori tetap terbatas berapa pun ukuran input.
+# Tiap baris diberi flag fitur di luar range data latih; ringkasan drift (PSI/KS per
+# fitur) untuk seluruh file ikut dilaporkan di akhir.
+
+import argparse
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import streamlit.logger
+
+# Cache Streamlit dipakai tanpa runtime: sembunyikan peringatan "No runtime found"
+streamlit.logger.set_log_level("error")
+
+from utils.helpers import (csv_schema, features, load_compiled_model, load_model, read_csv_id,
+                           rf_predict_batch, iku_categories)
+from utils.registry import active_model, get_version
+from utils.drift import DriftAccumulator, bin_counts, flag_labels, range_flags, training_stats
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# ==============================
+# 1. Worker: model dimuat sekali per proses
+# ==============================
+# Potongan besar (~100 ribu baris) diprediksi dengan model sklearn hasil fit: predict
+# per pohon tervektorisasi di C, jauh lebih cepat dari forest terkompilasi (numpy) yang
+# dioptimalkan untuk batch kecil/latensi di dashboard & API. Harganya memori: tiap
+# worker memegang salinan privat forest sklearn. `--engine compiled` memakai artefak
+# mmap (satu salinan di page cache untuk semua worker), lebih hemat RSS tapi lebih
+# lambat; ukur dengan benchmarks/bench_memory.py (mode joblib vs mmap).
+engines = ("sklearn", "compiled")
+_model = None
+_schema = None
+_stats = None
+
+def _load_engine(model_path: Path, engine: str):
+    return load_compiled_model(model_path) if engine == "compiled" else load_model(model_path)
+
+def _init_worker(model_path: str, schema: dict, stats, engine: str = "sklearn"):
+    global _model, _schema, _stats
+    _model = _load_engine(Path(model_path), engine)
+    _schema = schema
+    _stats = stats   # dari proses utama: flag & drift semua worker memakai statistik yang sama
+
+def score_chunk(header: bytes, body: bytes) -> tuple:
+    """Parse satu potongan (header + baris mentah), prediksi & cek range dalam satu batch.
+
+    Return (DataFrame hasil, (hitungan bin drift, jumlah di luar range per fitur)).
+    """
+    df = read_csv_id(io.BytesIO(header + body), schema=_schema)
+    missing = [col for col in features if col not in df.columns]
+    if missing:
+        raise KeyError(f"Kolom fitur tidak ditemukan: {missing}")
+    X = df[features].to_numpy(dtype=np.float64)
+    flags = range_flags(X, _stats)
+    df["Prediksi_IKU"] = rf_predict_batch(df, _model)
+    df["Kategori"] = np.asarray(iku_categories(df["Prediksi_IKU"]), dtype=object)
+    df["Di_Luar_Range"] = flag_labels(flags)
+    return df, (bin_counts(X, _stats.edges), flags.sum(axis=0))
+
+def score_encode(header: bytes, body: bytes, fmt: str, with_header: bool):
+    """Skor + serialisasi di worker; proses utama tinggal menulis. Return (n_rows, payload, drift)"""
+    df, drift = score_chunk(header, body)
+    if fmt == "parquet":
+        import pyarrow as pa
+        return len(df), pa.Table.from_pandas(df, preserve_index=False), drift
+    if fmt == "csv":
+        return len(df), df.to_csv(index=False, header=with_header).encode("utf-8"), drift
+    return len(df), None, drift
+
+# ==============================
+# 2. Pembaca potongan & penulis streaming
+# ==============================
+def iter_raw_chunks(path: Path, chunksize: int):
+    """(header, blok baris mentah) per `chunksize` baris; asumsi tidak ada newline di dalam sel"""
+    with open(path, "rb") as f:
+        header = f.readline()
+        while True:
+            lines = list(itertools.islice(f, chunksize))
+            if not lines:
+                break
+            if not lines[-1].endswith(b"\n"):
+                lines[-1] += b"\n"
+            yield header, b"".join(lines)
+
+def output_format(path: Path) -> str:
+    if path is None:
+        return "none"
+    return "parquet" if Path(path).suffix.lower() in (".parquet", ".pq") else "csv"
+
+class StreamWriter:
+    """Tulis potongan hasil (bytes CSV / tabel Arrow) berurutan; file final diganti atomik"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.fmt = output_format(self.path)
+        self.tmp_path = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        self._writer = None
+        self._file = None
+
+    def write(self, payload):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.tmp_path, payload.schema)
+            self._writer.write_table(payload.cast(self._writer.schema))
+        else:
+            if self._file is None:
+                self._file = open(self.tmp_path, "wb")
+            self._file.write(payload)
+
+    def close(self, ok: bool = True):
+        for handle in (self._writer, self._file):
+            if handle is not None:
+                handle.close()
+        if not self.tmp_path.exists():
+            return
+        if ok:
+            os.replace(self.tmp_path, self.path)
+        else:
+            self.tmp_path.unlink()
+
+# ==============================
+# 3. Orkestrasi
+# ==============================
+def run(input_path: Path, output_path: Path, workers: int, chunksize: int,
+        schema: dict, model=None, engine: str = "sklearn") -> dict:
+    """Skor seluruh file dengan satu ModelVersion (default: aktif); return ringkasan throughput"""
+    # Di-resolve sekali: semua worker memakai versi model (dan range/statistik drift-nya)
+    # yang sama walau registry berganti
+    model = active_model() if model is None else model
+    stats = training_stats(model)
+    # Dimuat (dan sklearn di-import / artefak dikompilasi) sekali di proses utama:
+    # worker hasil fork mewarisinya
+    _load_engine(model.model_path, engine)
+    fmt = output_format(output_path)
+    writer = StreamWriter(output_path) if output_path else None
+    drift = DriftAccumulator(stats)
+    n_rows = 0
+
+    def consume(result):
+        nonlocal n_rows
+        n, payload, chunk_drift = result
+        n_rows += n
+        drift.add(*chunk_drift)
+        if writer:
+            writer.write(payload)
+
+    chunks = ((header, body, fmt, i == 0)
+              for i, (header, body) in enumerate(iter_raw_chunks(input_path, chunksize)))
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        if workers <= 0:
+            # Tanpa pool (baseline satu proses)
+            _init_worker(str(model.model_path), schema, stats, engine)
+            for args in chunks:
+                consume(score_encode(*args))
+        else:
+            max_inflight = 2 * workers   # batas potongan di memori
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(str(model.model_path), schema, stats, engine)) as pool:
+                pending = deque()
+                for args in chunks:
+                    pending.append(pool.submit(score_encode, *args))
+                    while len(pending) >= max_inflight:
+                        consume(pending.popleft().result())
+                while pending:
+                    consume(pending.popleft().result())
+        ok = True
+    finally:
+        if writer:
+            writer.close(ok)
+    seconds = time.perf_counter() - t0
+    summary = drift.summary()
+    return {"model": model.version, "engine": engine, "workers": workers, "rows": n_rows, "seconds": round(seconds, 3),
+            "rows_per_s": round(n_rows / seconds, 1) if seconds else None,
+            "drift": {feature: {"psi": round(float(row.PSI), 4), "level_psi": row.Level_PSI,
+                                "ks": round(float(row.KS), 4), "drift_ks": bool(row.Drift_KS),
+                                "di_luar_range": int(row.Di_Luar_Range)}
+                      for feature, row in summary.iterrows()}}
+
+def main():
+    parser = argparse.ArgumentParser(description="Skoring massal CSV IKU (streaming, multi-proses)")
+    parser.add_argument("input", type=Path, help="CSV masukan (format angka Indonesia)")
+    parser.add_argument("--output", type=Path, default=None, help="hasil .csv atau .parquet (kosong = hanya ukur)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1],
+                        help="jumlah proses worker; beberapa nilai = benchmark per jumlah (0 = tanpa pool)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="baris per potongan")
+    parser.add_argument("--keep", nargs="*", default=[],
+                        help="kolom tambahan yang ikut disalin ke hasil (mis. Kabupaten Skenario)")
+    parser.add_argument("--model", default=None, help="versi model di registry (default: versi aktif)")
+    parser.add_argument("--engine", choices=engines, default="sklearn",
+                        help="sklearn: cepat, salinan model per worker; compiled: artefak mmap bersama, RSS kecil")
+    args = parser.parse_args()
+
+    schema = {**csv_schema, **{col: "string" for col in args.keep}}
+    model = get_version(args.model) if args.model else active_model()
+    report = [run(args.input, args.output, n, args.chunksize, schema, model, args.engine) for n in args.workers]
+    for row in report:
+        print(json.dumps(row), file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
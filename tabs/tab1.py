@@ -1,4 +1,5 @@
 import streamlit as st 
+from utils.helpers import iku_ranges
 
 def show_tab():
     # ---------------------------------
@@ -129,7 +130,27 @@ def show_tab():
     # Klasifikasi IKU (HTML Table)
     # ---------------------------------
     st.markdown('<div style="padding-top:5px;"><span class="gradient-subheader">Klasifikasi Indeks Kualitas Udara (IKU)</span></div>', unsafe_allow_html=True)
-    st.markdown("""
+    iku_info = {
+        "Sangat Baik": ("🟢", "Udara sangat bersih, aman untuk semua orang"),
+        "Baik": ("🙂", "Sehat, aman untuk sebagian besar populasi"),
+        "Sedang": ("😐", "Kualitas mulai menurun, kelompok sensitif perlu waspada"),
+        "Kurang": ("⚠️", "Risiko kesehatan meningkat, perlu pengendalian polusi"),
+        "Sangat Kurang": ("❌", "Kualitas buruk sekali, berisiko tinggi bagi semua orang"),
+    }
+
+    # Rentang diambil dari batas yang sama dengan klasifikasi prediksi
+    rows_html = ""
+    for label, lo, hi in iku_ranges():
+        emoji, keterangan = iku_info[label]
+        rentang = f"{lo} – {hi}" if hi == 100 else f"{lo} – {hi - 0.01:.2f}"
+        rows_html += f"""
+            <tr>
+                <td>{emoji} {label}</td>
+                <td>{rentang}</td>
+                <td>{keterangan}</td>
+            </tr>"""
+
+    st.markdown(f"""
     <table>
         <thead>
             <tr>
@@ -138,32 +159,7 @@ def show_tab():
                 <th>Keterangan</th>
             </tr>
         </thead>
-        <tbody>
-            <tr>
-                <td>🟢 Sangat Baik</td>
-                <td>90 – 100</td>
-                <td>Udara sangat bersih, aman untuk semua orang</td>
-            </tr>
-            <tr>
-                <td>🙂 Baik</td>
-                <td>70 – 89.99</td>
-                <td>Sehat, aman untuk sebagian besar populasi</td>
-            </tr>
-            <tr>
-                <td>😐 Sedang</td>
-                <td>50 – 69.99</td>
-                <td>Kualitas mulai menurun, kelompok sensitif perlu waspada</td>
-            </tr>
-            <tr>
-                <td>⚠️ Kurang</td>
-                <td>25 – 49.99</td>
-                <td>Risiko kesehatan meningkat, perlu pengendalian polusi</td>
-            </tr>
-            <tr>
-                <td>❌ Sangat Kurang</td>
-                <td>0 – 24.99</td>
-                <td>Kualitas buruk sekali, berisiko tinggi bagi semua orang</td>
-            </tr>
+        <tbody>{rows_html}
         </tbody>
     </table>
     """, unsafe_allow_html=True)
@@ -1,9 +1,18 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from utils.helpers import rf_predict, iku_category  
+from utils.helpers import (rf_predict_interval, interval_level, iku_category, iku_ranges, iku_bins, color_map_demo, color_map_category,
+                           iku_colors, features, load_compiled_model)
 
 def show_tab():
+    # Import berat dilakukan di sini agar hanya dibayar saat halaman ini dibuka
+    import plotly.graph_objects as go
+    from utils.results import hot_results
+    from utils.sweep import grid_axis, sweep
+    from utils.explain import hot_contributions
+    from utils.figures import cached_figure
+    from utils.drift import out_of_range, training_stats
+    from utils.registry import active_model
+
     # ---------------------------------
     # CSS Styling Global (Gradient Subheader, Box, Caption)
     # ---------------------------------
@@ -37,28 +46,18 @@ def show_tab():
     # Judul Tab
     st.markdown('<div class="gradient-subheader">Demo Prediksi Interaktif</div>', unsafe_allow_html=True)
 
-    # Load df_hot.csv & bersihkan data
+    # Versi model di-resolve sekali per rerun: semua prediksi, range & flag di tab ini
+    # memakai versi yang sama walau registry berganti di tengah rerun
+    model = active_model()
+    input_ranges = model.input_ranges
+
+    # Hasil prediksi df_hot (dihitung sekali per versi model+data)
     try:
-        df_hot = pd.read_csv("data/df_hot.csv")
+        results = hot_results(model.model_path)
     except FileNotFoundError:
         st.error("❌ File df_hot.csv tidak ditemukan!")
         return
-
-    # Bersihkan angka
-    num_cols_float = ["IKTL_(%)", "Rumah_Tangga_Listrik_PLN_(%)", "Indeks_Kualitas_Udara_(%)"]
-    for col in num_cols_float:
-        df_hot[col] = df_hot[col].astype(str).str.replace(",", ".").astype(float)
-
-    df_hot["Kendaraan_Bermotor"] = df_hot["Kendaraan_Bermotor"].astype(str).str.replace(".", "").astype(float)
-    df_hot["Karhutla_(ha)"] = pd.to_numeric(df_hot["Karhutla_(ha)"], errors="coerce")
-
-    # Input Ranges
-    input_ranges = {
-        "IKTL_(%)": (0.00, 100.00),
-        "Karhutla_(ha)": (0.00, 336798.00),
-        "Kendaraan_Bermotor": (142862, 22774562),
-        "Rumah_Tangga_Listrik_PLN_(%)": (43.14, 100.00)
-    }
+    df_hot = results.frame()
 
     st.markdown(
         "Masukkan nilai fitur secara manual. Range data latih ditampilkan di bawah. Nilai di luar range tetap bisa diprediksi, tetapi mungkin kurang akurat."
@@ -67,18 +66,25 @@ def show_tab():
     # ---------------------------------
     # Input User
     # ---------------------------------
-    IKTL = st.number_input("Indeks Kualitas Tutupan Lahan (%)", value=50.0, step=0.1)
+    IKTL = st.number_input("Indeks Kualitas Tutupan Lahan (%)", value=50.0, step=0.1, key="tab2_iktl")
     st.markdown(f"<div class='input-caption'>Range data latih: {input_ranges['IKTL_(%)'][0]} – {input_ranges['IKTL_(%)'][1]}</div>", unsafe_allow_html=True)
 
-    Karhutla = st.number_input("Luas Kebakaran Hutan dan Lahan (ha)", value=0.0, step=1.0)
+    Karhutla = st.number_input("Luas Kebakaran Hutan dan Lahan (ha)", value=0.0, step=1.0, key="tab2_karhutla")
     st.markdown(f"<div class='input-caption'>Range data latih: {input_ranges['Karhutla_(ha)'][0]} – {input_ranges['Karhutla_(ha)'][1]}</div>", unsafe_allow_html=True)
 
-    Kendaraan = st.number_input("Jumlah Kendaraan Bermotor (unit)", value=142862, step=1)
+    Kendaraan = st.number_input("Jumlah Kendaraan Bermotor (unit)", value=142862, step=1, key="tab2_kendaraan")
     st.markdown(f"<div class='input-caption'>Range data latih: {input_ranges['Kendaraan_Bermotor'][0]} – {input_ranges['Kendaraan_Bermotor'][1]}</div>", unsafe_allow_html=True)
 
-    Listrik = st.number_input("Persentase Rumah Tangga Listrik PLN (%)", value=50.0, step=0.1)
+    Listrik = st.number_input("Persentase Rumah Tangga Listrik PLN (%)", value=50.0, step=0.1, key="tab2_listrik")
     st.markdown(f"<div class='input-caption'>Range data latih: {input_ranges['Rumah_Tangga_Listrik_PLN_(%)'][0]} – {input_ranges['Rumah_Tangga_Listrik_PLN_(%)'][1]}</div>", unsafe_allow_html=True)
 
+    col_labels = {
+        "IKTL_(%)": "Indeks Kualitas Tutupan Lahan (%)",
+        "Karhutla_(ha)": "Luas Kebakaran Hutan dan Lahan (ha)",
+        "Kendaraan_Bermotor": "Jumlah Kendaraan Bermotor (unit)",
+        "Rumah_Tangga_Listrik_PLN_(%)": "Persentase Rumah Tangga Listrik PLN (%)"
+    }
+
     # Tombol Prediksi
     if st.button("Prediksi IKU"):
         X_input = pd.Series({
@@ -87,46 +93,36 @@ def show_tab():
             "Kendaraan_Bermotor": Kendaraan,
             "Rumah_Tangga_Listrik_PLN_(%)": Listrik
         })
-        pred = rf_predict(X_input)  # pakai RF augmentasi langsung
+        hasil = rf_predict_interval(X_input, model=load_compiled_model(model.model_path))
+        pred = hasil["prediksi"]
         kategori = iku_category(pred)
 
-        color_map_demo = {
-            "Sangat Baik": "#4E342E",
-            "Baik": "#6D4C41",
-            "Sedang": "#A1887F",
-            "Kurang": "#D7CCC8",
-            "Sangat Kurang": "#E2CEB1"
-        }
-
         st.markdown(
-            f"<h3 style='background-color:{color_map_demo[kategori]};"
+            f"<h3 style='background-color:{iku_colors([pred], color_map_demo)[0]};"
             f"color:white;padding:10px;border-radius:5px;'>Prediksi IKU: {pred:.2f}% ({kategori})</h3>",
             unsafe_allow_html=True
         )
-
-        col_labels = {
-            "IKTL_(%)": "Indeks Kualitas Tutupan Lahan (%)",
-            "Karhutla_(ha)": "Luas Kebakaran Hutan dan Lahan (ha)",
-            "Kendaraan_Bermotor": "Jumlah Kendaraan Bermotor (unit)",
-            "Rumah_Tangga_Listrik_PLN_(%)": "Persentase Rumah Tangga Listrik PLN (%)"
-        }
+        st.caption(
+            f"Interval {interval_level:.0%} antar pohon: {hasil['bawah']:.2f}% – {hasil['atas']:.2f}% "
+            f"(std {hasil['std']:.2f})"
+        )
 
         # Warning jika input di luar range
-        for val, (col, (min_val, max_val)) in zip([IKTL, Karhutla, Kendaraan, Listrik], input_ranges.items()):
-            if val < min_val or val > max_val:
-                label = col_labels.get(col, col)
-                st.warning(f"⚠️ {label} di luar range data latih ({min_val} – {max_val})")
+        flags = out_of_range(X_input.to_frame().T, training_stats(model)).iloc[0]
+        for col in flags[flags].index:
+            min_val, max_val = input_ranges[col]
+            label = col_labels.get(col, col)
+            st.warning(f"⚠️ {label} di luar range data latih ({min_val} – {max_val})")
 
     # ---------------------------------
     # Prediksi vs Data Aktual 2022
     # ---------------------------------
     st.markdown('<div class="gradient-subheader">Prediksi vs Data Aktual 2022 (Hot Test)</div>', unsafe_allow_html=True)
 
-    provinsi_hot = st.selectbox("Pilih Provinsi (2022)", df_hot["Provinsi"])
-    df_row = df_hot[df_hot["Provinsi"] == provinsi_hot].iloc[0]
-    X_input_hot = df_row[["IKTL_(%)", "Karhutla_(ha)", "Kendaraan_Bermotor", "Rumah_Tangga_Listrik_PLN_(%)"]]
-    pred_hot = rf_predict(X_input_hot)
-    kategori_hot = iku_category(pred_hot)
+    provinsi_hot = st.selectbox("Pilih Provinsi (2022)", df_hot["Provinsi"], key="tab2_provinsi")
+    df_row = results.row(provinsi_hot)
+    pred_hot = df_row["Prediksi_IKU"]
+    kategori_hot = df_row["Kategori"]
     aktual_hot = df_row["Indeks_Kualitas_Udara_(%)"]
     error_hot = abs(pred_hot - aktual_hot)
 
@@ -134,12 +130,46 @@ def show_tab():
         f"<div class='prediction-box'>"
         f"<h3>{provinsi_hot}</h3>"
         f"<p><b>Prediksi:</b> {pred_hot:.2f}% ({kategori_hot})</p>"
+        f"<p><b>Interval {interval_level:.0%}:</b> {df_row['Prediksi_Bawah']:.2f}% – {df_row['Prediksi_Atas']:.2f}%</p>"
         f"<p><b>Aktual:</b> {aktual_hot:.2f}%</p>"
         f"<p><b>Error Absolut:</b> {error_hot:.2f}%</p>"
         f"</div>",
         unsafe_allow_html=True
     )
 
+    # ---------------------------------
+    # Kontribusi Fitur (Waterfall) untuk Provinsi Terpilih
+    # ---------------------------------
+    kontribusi = hot_contributions(model.model_path)
+    row_kontribusi = kontribusi.loc[kontribusi["Provinsi"] == provinsi_hot].iloc[0]
+
+    fig_waterfall = go.Figure(
+        go.Waterfall(
+            orientation="v",
+            measure=["absolute"] + ["relative"] * len(features) + ["total"],
+            x=["Rata-rata Model"] + [col_labels[f] for f in features] + ["Prediksi IKU"],
+            y=[row_kontribusi["Bias"]] + [row_kontribusi[f] for f in features] + [0],
+            text=[f"{row_kontribusi['Bias']:.2f}"] + [f"{row_kontribusi[f]:+.2f}" for f in features]
+                 + [f"{row_kontribusi['Prediksi_IKU']:.2f}"],
+            textposition="outside",
+            increasing=dict(marker=dict(color="#6D4C41")),
+            decreasing=dict(marker=dict(color="#D7CCC8")),
+            totals=dict(marker=dict(color="#A47551")),
+            connector=dict(line=dict(color="#999", dash="dot"))
+        )
+    )
+    fig_waterfall.update_layout(
+        title=f"Kontribusi Fitur terhadap Prediksi IKU – {provinsi_hot}",
+        height=500,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        yaxis_title="IKU (%)",
+        margin=dict(l=20, r=20, t=60, b=40)
+    )
+    st.plotly_chart(fig_waterfall, use_container_width=True)
+    st.caption("Kontribusi dihitung dari jalur keputusan tiap pohon (metode Saabas); "
+               "rata-rata model + jumlah kontribusi = prediksi.")
+
     # ---------------------------------
     # Grafik Line: Aktual vs Prediksi Semua Provinsi
     # ---------------------------------
@@ -148,55 +178,156 @@ def show_tab():
         unsafe_allow_html=True
     )
 
-    preds = []
-    for _, row in df_hot.iterrows():
-        X_input_hot = row[["IKTL_(%)", "Karhutla_(ha)", "Kendaraan_Bermotor", "Rumah_Tangga_Listrik_PLN_(%)"]]
-        pred_val = rf_predict(X_input_hot)
-        preds.append(pred_val)
-
-    # Buat figure tanpa secondary axis
-    fig = go.Figure()
-
-    # Aktual
-    fig.add_trace(
-        go.Scatter(
-            x=df_hot["Provinsi"],
-            y=df_hot["Indeks_Kualitas_Udara_(%)"],
-            mode="lines+markers",
-            name="Aktual",
-            line=dict(color="#734128")
+    def build_line():
+        preds = results.prediksi
+
+        # Buat figure tanpa secondary axis
+        fig = go.Figure()
+
+        # Aktual
+        fig.add_trace(
+            go.Scatter(
+                x=df_hot["Provinsi"],
+                y=df_hot["Indeks_Kualitas_Udara_(%)"],
+                mode="lines+markers",
+                name="Aktual",
+                line=dict(color="#734128")
+            )
+        )
+
+        # Prediksi
+        fig.add_trace(
+            go.Scatter(
+                x=df_hot["Provinsi"],
+                y=preds,
+                error_y=dict(
+                    type="data",
+                    symmetric=False,
+                    array=results.atas - preds,
+                    arrayminus=preds - results.bawah,
+                    color="#A47551",
+                    thickness=1
+                ),
+                mode="lines+markers",
+                name=f"Prediksi (interval {interval_level:.0%})",
+                line=dict(color="#A47551", dash="dash")
+            )
         )
-    )
 
-    # Prediksi
-    fig.add_trace(
-        go.Scatter(
-            x=df_hot["Provinsi"],
-            y=preds,
-            mode="lines+markers",
-            name="Prediksi",
-            line=dict(color="#A47551", dash="dash")
+        # Layout
+        fig.update_layout(
+            width=1600,
+            height=600,
+            plot_bgcolor="rgba(0,0,0,0)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            xaxis=dict(showgrid=False, tickangle=45),
+            legend=dict(
+                orientation="h",
+                yanchor="top",
+                y=-0.5,
+                xanchor="center",
+                x=0.5
+            ),
+            margin=dict(l=20, r=20, t=40, b=80)
         )
+
+        # Label sumbu
+        fig.update_yaxes(title_text="IKU (%)")
+        return fig
+
+    # Tidak bergantung input user: dibangun sekali per versi model+data
+    fig = cached_figure("tab2_line", f"{results.version}.{interval_level}", build_line)
+
+    st.plotly_chart(fig, use_container_width=False)
+
+    # ---------------------------------
+    # Simulasi What-If (Sweep Fitur)
+    # ---------------------------------
+    st.markdown('<div class="gradient-subheader">Simulasi What-If (Sweep Fitur)</div>', unsafe_allow_html=True)
+    st.markdown(
+        "Pilih 1 atau 2 fitur untuk disapu di sepanjang range data latih. "
+        "Fitur lain memakai nilai input di atas; seluruh grid diprediksi dalam satu kali proses."
     )
 
-    # Layout
-    fig.update_layout(
-        width=1600,
-        height=600,
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        xaxis=dict(showgrid=False, tickangle=45),
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.5,
-            xanchor="center",
-            x=0.5
-        ),
-        margin=dict(l=20, r=20, t=40, b=80)
+    fixed = {
+        "IKTL_(%)": IKTL,
+        "Karhutla_(ha)": Karhutla,
+        "Kendaraan_Bermotor": Kendaraan,
+        "Rumah_Tangga_Listrik_PLN_(%)": Listrik
+    }
+    sweep_features = st.multiselect(
+        "Fitur yang disapu (maks. 2)", features, default=["Kendaraan_Bermotor"],
+        max_selections=2, format_func=col_labels.get, key="tab2_sweep_features"
     )
+    if not sweep_features:
+        st.info("Pilih minimal satu fitur untuk simulasi.")
+        return
 
-    # Label sumbu
-    fig.update_yaxes(title_text="IKU (%)")
+    if len(sweep_features) == 1:
+        n_points = st.slider("Jumlah titik grid", 20, 1000, 200, step=20, key="tab2_sweep_n")
+    else:
+        n_points = st.slider("Jumlah titik grid per sumbu", 10, 150, 50, step=10, key="tab2_sweep_n2")
+    result = sweep(fixed, tuple(grid_axis(f, n_points, ranges=input_ranges) for f in sweep_features),
+                   model_path=model.model_path)
+
+    fig_sweep = go.Figure()
+    if len(sweep_features) == 1:
+        # Kurva what-if (ICE: satu fitur digeser untuk satu baris input, bukan rata-rata df_hot)
+        # + pita kategori IKU
+        feature = sweep_features[0]
+        for label, lo, hi in iku_ranges():
+            fig_sweep.add_hrect(y0=lo, y1=hi, fillcolor=color_map_category[label], opacity=0.12,
+                                line_width=0, annotation_text=label, annotation_position="right")
+        fig_sweep.add_trace(
+            go.Scatter(
+                x=result["values"][0],
+                y=result["prediksi"],
+                customdata=result["kategori"],
+                mode="lines+markers",
+                name="Prediksi IKU",
+                line=dict(color="#734128"),
+                marker=dict(color=iku_colors(result["prediksi"]), size=5),
+                hovertemplate="%{x:,.2f}<br>IKU %{y:.2f}% (%{customdata})<extra></extra>"
+            )
+        )
+        fig_sweep.add_vline(x=fixed[feature], line_dash="dot", line_color="#A47551",
+                            annotation_text="Input saat ini")
+        fig_sweep.update_layout(xaxis_title=col_labels[feature], yaxis_title="IKU (%)",
+                                yaxis=dict(range=[0, 100]))
+    else:
+        # Heatmap 2-D + garis batas kategori IKU
+        fx, fy = sweep_features
+        x_vals, y_vals = result["values"]
+        z = result["prediksi"].T   # baris = sumbu y
+        fig_sweep.add_trace(
+            go.Heatmap(
+                x=x_vals, y=y_vals, z=z,
+                customdata=result["kategori"].T,
+                colorscale="YlOrBr", reversescale=True, zmin=0, zmax=100,
+                colorbar=dict(title="IKU (%)"),
+                hovertemplate="%{x:,.2f}, %{y:,.2f}<br>IKU %{z:.2f}% (%{customdata})<extra></extra>"
+            )
+        )
+        for batas in iku_bins:
+            fig_sweep.add_trace(
+                go.Contour(
+                    x=x_vals, y=y_vals, z=z,
+                    contours=dict(coloring="none", start=batas, end=batas, size=1, showlabels=True),
+                    line=dict(color="#4E342E", width=1.5),
+                    showscale=False, hoverinfo="skip", name=f"Batas {batas}%"
+                )
+            )
+        fig_sweep.add_trace(
+            go.Scatter(x=[fixed[fx]], y=[fixed[fy]], mode="markers", name="Input saat ini",
+                       marker=dict(symbol="x", size=12, color="#4E342E"))
+        )
+        fig_sweep.update_layout(xaxis_title=col_labels[fx], yaxis_title=col_labels[fy])
 
-    st.plotly_chart(fig, use_container_width=False)
\ No newline at end of file
+    fig_sweep.update_layout(
+        height=550,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        showlegend=False,
+        margin=dict(l=20, r=20, t=40, b=40)
+    )
+    st.plotly_chart(fig_sweep, use_container_width=True)
@@ -3,18 +3,93 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import folium
-from streamlit_folium import st_folium
-from rapidfuzz import process
-import joblib
-import json
-import os
-from utils.helpers import df_hot, df_latih, features, features_fullname, iku_category, geojson_prov, color_map_category
+import streamlit.components.v1 as components
+from utils.helpers import file_signature, load_compiled_model, load_metrics, rf_predict_batch
+from utils.registry import active_model, get_version, list_versions
+from utils.evaluation import evaluate
+from utils.drift import check_batch, flag_labels, training_stats
+from utils.perf import stopwatch
+
+# Tahun data yang menjadi dasar teks narasi & insight di tab ini
+tahun_narasi = 2022
+
+def show_model_comparison(model_a, model_b, df_hot: pd.DataFrame, tahun: int, data_version: str):
+    """Metrik & prediksi dua versi model berdampingan (model dimuat lazily, di-cache per versi)"""
+    import numpy as np
+    import plotly.graph_objects as go
+    from utils.figures import cached_figure
+    from utils.helpers import iku_categories
+
+    def version_metrics(mv) -> dict:
+        # Metrik langsung per versi; file metrik registry jika data aktual tidak tersedia
+        try:
+            return evaluate(mv).metrics
+        except KeyError:
+            return mv.metrics()
+
+    # Metrik evaluasi: satu baris per metrik, kolom per versi
+    all_a, all_b = version_metrics(model_a), version_metrics(model_b)
+    rows = []
+    for group in ("train_test", "hot_test"):
+        metrics_a = all_a.get(group, {})
+        metrics_b = all_b.get(group, {})
+        for key in dict.fromkeys([*metrics_a, *metrics_b]):
+            rows.append({"Metrik": key, model_a.version: metrics_a.get(key), model_b.version: metrics_b.get(key)})
+    if rows:
+        df_metrics = pd.DataFrame(rows).set_index("Metrik")
+        df_metrics["Selisih (B - A)"] = df_metrics[model_b.version] - df_metrics[model_a.version]
+        st.dataframe(df_metrics.style.format("{:.4f}", na_rep="–"), use_container_width=True)
+    else:
+        st.caption("Belum ada metrik evaluasi untuk kedua versi.")
+
+    # Prediksi tahun terpilih dengan kedua model
+    pred_a = rf_predict_batch(df_hot, load_compiled_model(model_a.model_path))
+    pred_b = rf_predict_batch(df_hot, load_compiled_model(model_b.model_path))
+    selisih = pred_b - pred_a
+    berubah = np.asarray(iku_categories(pred_a)) != np.asarray(iku_categories(pred_b))
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rata-rata |selisih|", f"{np.abs(selisih).mean():.2f}")
+    col2.metric("Selisih maks", f"{np.abs(selisih).max():.2f}")
+    col3.metric("Kategori berubah", f"{int(berubah.sum())} provinsi")
+
+    def build_compare():
+        lo, hi = float(min(pred_a.min(), pred_b.min())), float(max(pred_a.max(), pred_b.max()))
+        fig = go.Figure([
+            go.Scatter(x=[lo, hi], y=[lo, hi], mode="lines", line=dict(color="gray", dash="dash"),
+                       hoverinfo="skip", showlegend=False),
+            go.Scatter(x=pred_a, y=pred_b, mode="markers", text=df_hot["Provinsi"],
+                       marker=dict(color="#A67845", size=12, line=dict(width=0.5, color="black")),
+                       hovertemplate="%{text}<br>A: %{x:.2f}<br>B: %{y:.2f}<extra></extra>", showlegend=False),
+        ])
+        fig.update_layout(xaxis_title=f"Prediksi IKU {model_a.version}", yaxis_title=f"Prediksi IKU {model_b.version}",
+                          plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
+                          margin=dict(t=20, l=10, r=10, b=10), height=400)
+        return fig
+
+    versions_key = ".".join(file_signature(m.model_path)[2][:16] for m in (model_a, model_b))
+    st.plotly_chart(cached_figure(f"tab3_compare_{tahun}", f"{data_version}.{versions_key}", build_compare),
+                    use_container_width=True)
+
+    df_compare = pd.DataFrame({
+        "Provinsi": df_hot["Provinsi"].to_numpy(),
+        model_a.version: pred_a,
+        model_b.version: pred_b,
+        "Selisih (B - A)": selisih,
+    }).sort_values("Selisih (B - A)", key=np.abs, ascending=False)
+    st.caption(f"Prediksi per provinsi ({tahun}), urut selisih terbesar.")
+    st.dataframe(df_compare.style.format({model_a.version: "{:.2f}", model_b.version: "{:.2f}",
+                                          "Selisih (B - A)": "{:+.2f}"}),
+                 hide_index=True, use_container_width=True)
 
 def show_tab():
+    # Import berat dilakukan di sini agar hanya dibayar saat halaman ini dibuka
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from utils.choropleth import choropleth_html
+    from utils.panel import load_panel
+    from utils.figures import cached_figure, ranking_figure
+
     # ---------------------------------
     # CSS Global
     # ---------------------------------
@@ -39,93 +114,149 @@ def show_tab():
     </style>
     """, unsafe_allow_html=True)
 
+    # Timing per bagian (no-op jika profiling mati)
+    sw = stopwatch("tab3")
+
     # ---------------------------------
     # Load Model & Metrics
     # ---------------------------------
-    rf_model = joblib.load("data/rf_augmentasi.pkl")
-
-    metrics_file = "data/eval_metrics.json"
-    if not os.path.exists(metrics_file):
-        st.error("File eval_metrics.json tidak ditemukan! Pastikan sudah disimpan saat training.")
-        return
-    with open(metrics_file, "r") as f:
-        metrics = json.load(f)
+    sw.lap("metrik")
+    # Versi model di-resolve sekali per rerun (registry bisa berganti tanpa restart)
+    model = active_model()
+    panel = load_panel(model.model_path)
+
+    # Metrik dihitung langsung dari prediksi model aktif; file statis hanya cadangan
+    evaluasi = None
+    try:
+        evaluasi = evaluate(model)
+        metrics = evaluasi.metrics
+    except KeyError:
+        try:
+            metrics = load_metrics(model.metrics_path)
+        except FileNotFoundError:
+            st.error("File eval_metrics.json tidak ditemukan! Pastikan sudah disimpan saat training.")
+            sw.stop()
+            return
 
     train_metrics = metrics.get("train_test", {})
     hot_metrics = metrics.get("hot_test", {})
+    ci = metrics.get("ci", {})
+
+    def ci_help(key: str, fmt: str = ".4f"):
+        if key not in ci:
+            return None
+        lo, hi = ci[key]
+        return f"CI bootstrap {ci['level']:.0%}: {lo:{fmt}} – {hi:{fmt}}"
 
-    # Bersihkan kolom numerik
-    for col in features:
-        df_hot[col] = pd.to_numeric(df_hot[col], errors='coerce').fillna(0)
-        df_latih[col] = pd.to_numeric(df_latih[col], errors='coerce').fillna(0)
+    def metric_text(values: dict, key: str, fmt: str = ".4f", suffix: str = "") -> str:
+        # Metrik yang tidak tersedia ditampilkan "–", bukan 0
+        return f"{values[key]:{fmt}}{suffix}" if key in values else "–"
 
     # ---------------------------------
     # Evaluasi Metrics
     # ---------------------------------
     st.markdown('<div class="gradient-subheader-tab3">Evaluasi Metrik</div>', unsafe_allow_html=True)
-    st.caption("Nilai diambil langsung dari hasil evaluasi agar konsisten.")
+    if evaluasi is None:
+        sumber = "Nilai diambil dari file hasil evaluasi"
+    elif model.split:
+        sumber = "Dihitung langsung dari prediksi model, memakai split train/test yang tercatat saat training"
+    else:
+        sumber = "Train/test dari file hasil evaluasi training; hot test dihitung langsung dari prediksi model"
+    st.caption(f"{sumber}. Model aktif: **{model.version}**"
+               + (f" (dibuat {model.created})" if model.created else ""))
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("R² Train", f"{train_metrics.get('r2_train', 0):.4f}")
-    col2.metric("R² Test", f"{train_metrics.get('r2_test', 0):.4f}")
-    col3.metric("RMSE Test", f"{train_metrics.get('rmse_test', 0):.2f}")
-    col4.metric("MAPE Test", f"{train_metrics.get('mape_test', 0):.2f}%")
+    col1.metric("R² Train", metric_text(train_metrics, "r2_train"))
+    col2.metric("R² Test", metric_text(train_metrics, "r2_test"), help=ci_help("r2_test"))
+    col3.metric("RMSE Test", metric_text(train_metrics, "rmse_test", ".2f"), help=ci_help("rmse_test", ".2f"))
+    col4.metric("MAPE Test", metric_text(train_metrics, "mape_test", ".2f", "%"), help=ci_help("mape_test", ".2f"))
 
     st.markdown('<div class="gradient-subheader-tab3">Evaluasi Metrik Hot Test (2022)</div>', unsafe_allow_html=True)
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("R² Hot", f"{hot_metrics.get('r2_hot', 0):.4f}")
-    col2.metric("RMSE Hot", f"{hot_metrics.get('rmse_hot', 0):.2f}")
-    col3.metric("MAE Hot", f"{hot_metrics.get('mae_hot', 0):.2f}")
-    col4.metric("MAPE Hot", f"{hot_metrics.get('mape_hot', 0):.2f}%")
+    col1.metric("R² Hot", metric_text(hot_metrics, "r2_hot"), help=ci_help("r2_hot"))
+    col2.metric("RMSE Hot", metric_text(hot_metrics, "rmse_hot", ".2f"), help=ci_help("rmse_hot", ".2f"))
+    col3.metric("MAE Hot", metric_text(hot_metrics, "mae_hot", ".2f"), help=ci_help("mae_hot", ".2f"))
+    col4.metric("MAPE Hot", metric_text(hot_metrics, "mape_hot", ".2f", "%"), help=ci_help("mape_hot", ".2f"))
+
+    if evaluasi is not None:
+        with st.expander("Residual per provinsi (Hot Test 2022)", expanded=False):
+            df_res = evaluasi.residual_set("hot")
+
+            def build_residual():
+                ranked = df_res.sort_values("Residual")
+                fig = go.Figure(go.Bar(
+                    x=ranked["Residual"], y=ranked["Provinsi"], orientation="h",
+                    marker=dict(color=ranked["Residual"], colorscale=[[0, "#804000"], [0.5, "#f0f0f0"], [1, "#E2CEB1"]],
+                                cmid=0, showscale=False),
+                    customdata=ranked[["Aktual", "Prediksi_IKU"]],
+                    hovertemplate="%{y}<br>Aktual: %{customdata[0]:.2f}<br>Prediksi: %{customdata[1]:.2f}"
+                                  "<br>Residual: %{x:+.2f}<extra></extra>",
+                ))
+                fig.update_layout(xaxis_title="Residual (aktual - prediksi)", plot_bgcolor="rgba(0,0,0,0)",
+                                  paper_bgcolor="rgba(0,0,0,0)", margin=dict(t=20, l=10, r=10, b=10),
+                                  height=max(400, 22 * len(ranked) + 60))
+                return fig
+
+            st.caption("Residual positif: model memprediksi lebih rendah dari nilai aktual.")
+            st.plotly_chart(cached_figure("tab3_residual", evaluasi.version, build_residual), use_container_width=True)
+
+    # ---------------------------------
+    # Pilih Tahun (peta, top/bottom, scatter, korelasi)
+    # ---------------------------------
+    tahun = st.select_slider("Tahun", options=panel.years, value=panel.years[-1], key="tab3_tahun")
+    df_hot = panel.tahun(tahun)
+    # Kunci cache figure: tahun masuk ke nama grafik, versi = versi panel (model+data);
+    # di disk hanya versi terbaru tiap nama yang disimpan
+    data_version = panel.version
+    # Narasi & insight (angka, peringkat, korelasi) ditulis dari data tahun_narasi
+    narasi = tahun == tahun_narasi
+    if not narasi:
+        st.caption(f"Narasi dan insight di bawah grafik ditulis berdasarkan data {tahun_narasi}; "
+                   f"pilih tahun {tahun_narasi} untuk menampilkannya.")
 
     # ---------------------------------
-    # Prediksi Hot Test dengan RF langsung
+    # Perbandingan Dua Versi Model (registry)
     # ---------------------------------
-    df_hot["Prediksi_IKU"] = df_hot[features].apply(lambda row: rf_model.predict(row.to_frame().T)[0], axis=1)
-    df_hot["Kategori"] = df_hot["Prediksi_IKU"].apply(iku_category)
+    versions = list_versions()
+    if len(versions) >= 2:
+        sw.lap("perbandingan")
+        with st.expander("Bandingkan dua versi model", expanded=False):
+            col_a, col_b = st.columns(2)
+            index_a = versions.index(model.version) if model.version in versions else 0
+            name_a = col_a.selectbox("Model A", versions, index=index_a, key="tab3_model_a")
+            others = [v for v in versions if v != name_a]
+            name_b = col_b.selectbox("Model B", others, index=len(others) - 1, key="tab3_model_b")
+            show_model_comparison(get_version(name_a), get_version(name_b), df_hot, tahun, data_version)
+
+    # ---------------------------------
+    # Drift Input terhadap Data Latih
+    # ---------------------------------
+    sw.lap("drift")
+    st.markdown(f'<div class="gradient-subheader-tab3">Drift Input terhadap Data Latih ({tahun})</div>', unsafe_allow_html=True)
+    st.caption("PSI dan KS membandingkan sebaran tiap faktor tahun ini dengan data latih. "
+               "PSI < 0,1 stabil, 0,1–0,25 sedang, > 0,25 signifikan; KS melewati nilai kritis berarti sebaran berbeda (α = 5%).")
+    drift = check_batch(df_hot, training_stats(model))
+    df_drift = drift.summary.drop(columns="N")
+    st.dataframe(df_drift.style.format({"PSI": "{:.3f}", "KS": "{:.3f}", "KS_Kritis": "{:.3f}"}),
+                 use_container_width=True)
+    ekstrapolasi = drift.ekstrapolasi.to_numpy()
+    if ekstrapolasi.any():
+        labels = flag_labels(drift.flags.to_numpy())[ekstrapolasi]
+        rows = [f"{p} ({f.replace(';', ', ')})" for p, f in zip(df_hot["Provinsi"].to_numpy()[ekstrapolasi], labels)]
+        st.warning(f"⚠️ {len(rows)} provinsi memiliki faktor di luar range data latih (prediksi berupa ekstrapolasi): "
+                   + "; ".join(rows))
 
     # ---------------------------------
     # Peta Choropleth
     # ---------------------------------
-    st.markdown('<div class="gradient-subheader-tab3">Peta Choropleth Prediksi Indeks Kualitas Udara (2022)</div>', unsafe_allow_html=True)
+    sw.lap("peta")
+    st.markdown(f'<div class="gradient-subheader-tab3">Peta Choropleth Prediksi Indeks Kualitas Udara ({tahun})</div>', unsafe_allow_html=True)
     st.caption("Peta ini menampilkan sebaran prediksi kualitas udara per provinsi. Semakin gelap warnanya, semakin baik nilai IKU yang diprediksi. " \
     "Peta juga dapat digeser, di-zoom, dan kursor bisa diarahkan ke provinsi tertentu untuk melihat nilai detail.")
     
-    m = folium.Map(location=[-2.5, 118], zoom_start=5)
-    geojson_prov_list = [f['properties']['Propinsi'].strip().upper() for f in geojson_prov['features']]
-
-    def map_provinsi_auto(prov_name, choices, score_cutoff=80):
-        result = process.extractOne(prov_name.strip().upper(), choices, score_cutoff=score_cutoff)
-        return result[0] if result else prov_name.strip().upper()
-
-    df_hot['Provinsi_geo'] = df_hot['Provinsi'].apply(lambda x: map_provinsi_auto(x, geojson_prov_list))
-    prov_to_pred = df_hot.set_index('Provinsi_geo')['Prediksi_IKU'].to_dict()
-
-    for feature in geojson_prov['features']:
-        prov = feature['properties']['Propinsi'].strip().upper()
-        pred_val = prov_to_pred.get(prov, None)
-        feature['properties']['Prediksi_IKU'] = f"{pred_val:.2f}" if pred_val is not None else "N/A"
-
-    folium.Choropleth(
-        geo_data=geojson_prov,
-        name='choropleth',
-        data=df_hot,
-        columns=['Provinsi_geo', 'Prediksi_IKU'],
-        key_on='feature.properties.Propinsi',
-        fill_color='YlOrBr',
-        fill_opacity=0.7,
-        line_opacity=0.2,
-        legend_name='Prediksi IKU (%), Semakin Gelap Semakin Baik',
-    ).add_to(m)
-
-    folium.GeoJson(
-        geojson_prov,
-        tooltip=folium.GeoJsonTooltip(
-            fields=['Propinsi', 'Prediksi_IKU'],
-            aliases=['Provinsi:', 'Prediksi IKU:'],
-            localize=True
-        )
-    ).add_to(m)
-    st_folium(m, width=None, height=500)
+    unmatched = df_hot.loc[df_hot["Kode_Provinsi"].isna(), "Provinsi"].tolist()
+    if unmatched:
+        st.warning(f"⚠️ Provinsi tidak terpetakan ke GeoJSON (tampil N/A): {', '.join(unmatched)}")
+    components.html(choropleth_html(df_hot), height=500)
 
     st.markdown("""
         <style>
@@ -161,86 +292,72 @@ def show_tab():
     st.markdown("<br>", unsafe_allow_html=True) 
 
     # ---------------------------------
-    # Top/Bottom 5 Provinsi
+    # Top/Bottom k Provinsi (grafik peringkat)
     # ---------------------------------
-    st.markdown('<div class="gradient-subheader-tab3">Top 5 & Bottom 5 Provinsi Berdasarkan Prediksi IKU (2022)</div>', unsafe_allow_html=True)
-    st.caption("Grafik berikut memperlihatkan 5 provinsi teratas dan terbawah dalam prediksi kualitas udara.")
-
-    df_sorted = df_hot.sort_values(by="Prediksi_IKU", ascending=False)
-    top5 = df_sorted.head(5)
-    bottom5 = df_sorted.tail(5).sort_values(by="Prediksi_IKU", ascending=True)
-    col_top, col_bottom = st.columns(2)
-
-    # Top 5
-    with col_top:
-        colors_top = ["#804000", "#A67845", "#C29A6C", "#D9B88C", "#E2CEB1"]
-        fig_top = go.Figure()
-        for i, row in enumerate(top5.itertuples()):
-            fig_top.add_trace(go.Bar(
-                x=[row.Prediksi_IKU],
-                y=[row.Provinsi],
-                orientation='h',
-                marker_color=colors_top[i],
-                text=f"{row.Prediksi_IKU:.2f}",
-                textposition='outside',
-                name=row.Provinsi
-            ))
-        fig_top.update_layout(yaxis={'categoryorder': 'total ascending', 'autorange': "reversed"},
-                              plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", showlegend=False, margin=dict(t=20, l=10, r=10, b=10), height=400)
-        st.plotly_chart(fig_top, use_container_width=True)
-
-    # Bottom 5
-    with col_bottom:
-        colors_bottom = ["#E2CEB1", "#D9B88C", "#C29A6C", "#A67845", "#804000"]
-        fig_bottom = go.Figure()
-        for i, row in enumerate(bottom5.itertuples()):
-            fig_bottom.add_trace(go.Bar(
-                x=[row.Prediksi_IKU],
-                y=[row.Provinsi],
-                orientation='h',
-                marker_color=colors_bottom[i],
-                text=f"{row.Prediksi_IKU:.2f}",
-                textposition='outside',
-                name=row.Provinsi
-            ))
-        fig_bottom.update_layout(yaxis={'categoryorder': 'total ascending'},
-                                 plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", showlegend=False, margin=dict(t=20, l=10, r=10, b=10), height=400)
-        st.plotly_chart(fig_bottom, use_container_width=True)
-
-    st.markdown("""
-        <style>
-            .no-white-block {
-                background: linear-gradient(135deg, #8B5E3C, #A47551);
-                color: white;
-                border-radius: 12px;
-                font-size: 14px;
-                padding: 12px;
-                margin-top: 10px;
-                box-shadow: 0 2px 6px rgba(0,0,0,0.15);
-                text-align: justify;
-            }
-        </style>
-        <div class="no-white-block">
-            🏅 <b>Papua Barat & Papua</b> menempati posisi tertinggi (≥94%), diikuti Kalimantan Utara, Gorontalo, dan Maluku Utara (>91%) → menunjukkan bahwa daerah-daerah dengan tekanan urbanisasi rendah masih mampu menjaga kualitas udara.<br>
-            ⚠️ <b>DKI Jakarta, Banten, dan tiga provinsi besar di Jawa</b> justru ada di posisi terbawah (<84%) → memperlihatkan tantangan serius akibat konsentrasi penduduk dan aktivitas ekonomi intensif.
-        </div>
-    """, unsafe_allow_html=True)
+    sw.lap("top_bottom")
+    n_provinsi = len(df_hot)
+    if n_provinsi > 1:
+        k = st.slider("Jumlah provinsi (k)", min_value=1, max_value=n_provinsi, value=min(5, n_provinsi), key="tab3_k")
+    else:
+        # Slider butuh min < max: dengan 0/1 provinsi k tetap
+        k = n_provinsi
+    semua = st.checkbox("Tampilkan peringkat lengkap semua provinsi", key="tab3_ranking_semua")
+
+    if semua:
+        st.markdown(f'<div class="gradient-subheader-tab3">Peringkat {n_provinsi} Provinsi Berdasarkan Prediksi IKU ({tahun})</div>', unsafe_allow_html=True)
+        st.caption("Grafik berikut memperlihatkan peringkat seluruh provinsi dalam prediksi kualitas udara.")
+        fig_rank = cached_figure(f"tab3_ranking_all_{tahun}", data_version, ranking_figure, df_hot)
+        st.plotly_chart(fig_rank, use_container_width=True)
+    else:
+        st.markdown(f'<div class="gradient-subheader-tab3">Top {k} & Bottom {k} Provinsi Berdasarkan Prediksi IKU ({tahun})</div>', unsafe_allow_html=True)
+        st.caption(f"Grafik berikut memperlihatkan {k} provinsi teratas dan terbawah dalam prediksi kualitas udara.")
+        col_top, col_bottom = st.columns(2)
+
+        # Satu trace per grafik; warna per bar lewat array marker_color
+        with col_top:
+            fig_top = cached_figure(f"tab3_top{k}_{tahun}", data_version, ranking_figure, df_hot, "Prediksi_IKU", "Provinsi", k)
+            st.plotly_chart(fig_top, use_container_width=True)
+        with col_bottom:
+            fig_bottom = cached_figure(f"tab3_bottom{k}_{tahun}", data_version, ranking_figure, df_hot, "Prediksi_IKU", "Provinsi", k, True)
+            st.plotly_chart(fig_bottom, use_container_width=True)
+
+    if narasi:
+        st.markdown("""
+            <style>
+                .no-white-block {
+                    background: linear-gradient(135deg, #8B5E3C, #A47551);
+                    color: white;
+                    border-radius: 12px;
+                    font-size: 14px;
+                    padding: 12px;
+                    margin-top: 10px;
+                    box-shadow: 0 2px 6px rgba(0,0,0,0.15);
+                    text-align: justify;
+                }
+            </style>
+            <div class="no-white-block">
+                🏅 <b>Papua Barat & Papua</b> menempati posisi tertinggi (≥94%), diikuti Kalimantan Utara, Gorontalo, dan Maluku Utara (>91%) → menunjukkan bahwa daerah-daerah dengan tekanan urbanisasi rendah masih mampu menjaga kualitas udara.<br>
+                ⚠️ <b>DKI Jakarta, Banten, dan tiga provinsi besar di Jawa</b> justru ada di posisi terbawah (<84%) → memperlihatkan tantangan serius akibat konsentrasi penduduk dan aktivitas ekonomi intensif.
+            </div>
+        """, unsafe_allow_html=True)
 
     # Insight utama setelah top/bottom
-    st.markdown("""
-    <div style="margin-top:12px; padding:12px; background-color:#f0f0f0; 
-                color:#333; border-radius:10px; font-size:14px; 
-                box-shadow: 0 0 5px rgba(0,0,0,0.05); text-align: justify;">
-        ✨ <b>Insight utama:</b> Grafik ini menyoroti <b>gap kualitas udara antarprovinsi</b>, yakni wilayah timur & sebagian tengah unggul dalam peringkat tertinggi, sementara provinsi padat di Jawa konsisten tertekan di posisi terbawah. Perbandingan ini menekankan pentingnya kebijakan diferensial, tidak hanya berbasis wilayah besar (timur–barat–tengah), tetapi juga berbasis <b>provinsi prioritas</b>.
-    </div>
-    """, unsafe_allow_html=True)
+    if narasi:
+        st.markdown("""
+        <div style="margin-top:12px; padding:12px; background-color:#f0f0f0; 
+                    color:#333; border-radius:10px; font-size:14px; 
+                    box-shadow: 0 0 5px rgba(0,0,0,0.05); text-align: justify;">
+            ✨ <b>Insight utama:</b> Grafik ini menyoroti <b>gap kualitas udara antarprovinsi</b>, yakni wilayah timur & sebagian tengah unggul dalam peringkat tertinggi, sementara provinsi padat di Jawa konsisten tertekan di posisi terbawah. Perbandingan ini menekankan pentingnya kebijakan diferensial, tidak hanya berbasis wilayah besar (timur–barat–tengah), tetapi juga berbasis <b>provinsi prioritas</b>.
+        </div>
+        """, unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # ---------------------------------
     # Analisis Faktor vs IKU (Scatter)
     # ---------------------------------
-    st.markdown('<div class="gradient-subheader-tab3">Analisis Faktor terhadap Prediksi IKU (2022)</div>', unsafe_allow_html=True)
+    sw.lap("scatter")
+    st.markdown(f'<div class="gradient-subheader-tab3">Analisis Faktor terhadap Prediksi IKU ({tahun})</div>', unsafe_allow_html=True)
     st.caption("Scatter plot berikut memperlihatkan hubungan tiap faktor dengan kualitas udara. Pola tren yang muncul memberi gambaran awal mengenai keterkaitan antar variabel.")
 
     features_fullname = {
@@ -254,182 +371,187 @@ def show_tab():
     # Filter faktor agar tidak termasuk Prediksi_IKU
     faktor_list = [f for f in features_fullname.keys() if f != "Prediksi_IKU"]
 
-    for i in range(0, len(faktor_list), 2):
-        col1, col2 = st.columns(2)
-        with col1:
-            faktor = faktor_list[i]
-            st.markdown(f"**{features_fullname[faktor]} vs {features_fullname['Prediksi_IKU']}**")
-            fig1 = px.scatter(
-                df_hot,
-                x=faktor,
-                y="Prediksi_IKU",
-                hover_name="Provinsi",
-                labels={faktor: features_fullname[faktor], "Prediksi_IKU": features_fullname["Prediksi_IKU"]}
-            )
-            fig1.update_traces(marker=dict(color="#A67845", size=14, line=dict(width=0.5, color='black')))
-            fig1.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", height=400)
-            st.plotly_chart(fig1, use_container_width=True)
-
-        if i + 1 < len(faktor_list):
-            faktor2 = faktor_list[i+1]
-            with col2:
-                st.markdown(f"**{features_fullname[faktor2]} vs {features_fullname['Prediksi_IKU']}**")
-                fig2 = px.scatter(
-                    df_hot,
-                    x=faktor2,
-                    y="Prediksi_IKU",
-                    hover_name="Provinsi",
-                    labels={faktor2: features_fullname[faktor2], "Prediksi_IKU": features_fullname["Prediksi_IKU"]}
-                )
-                fig2.update_traces(marker=dict(color="#A67845", size=14, line=dict(width=0.5, color='black')))
-                fig2.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", height=400)
-                st.plotly_chart(fig2, use_container_width=True)
+    def build_scatter(faktor):
+        fig = px.scatter(
+            df_hot,
+            x=faktor,
+            y="Prediksi_IKU",
+            hover_name="Provinsi",
+            labels={faktor: features_fullname[faktor], "Prediksi_IKU": features_fullname["Prediksi_IKU"]}
+        )
+        fig.update_traces(marker=dict(color="#A67845", size=14, line=dict(width=0.5, color='black')))
+        fig.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", height=400)
+        return fig
 
-    st.markdown("""
-        <style>
-            .no-white-block {
-                background: linear-gradient(135deg, #8B5E3C, #A47551);
-                color: white;
-                border-radius: 12px;
-                font-size: 14px;
-                padding: 12px;
-                margin-top: 10px;
-                box-shadow: 0 2px 6px rgba(0,0,0,0.15);
-                text-align: justify;
-            }
-        </style>
-        <div class="no-white-block">
-            🌳 <b>Indeks Kualitas Tutupan Lahan (%) →</b> pola positif: provinsi dengan tutupan lahan tinggi cenderung memiliki kualitas udara lebih baik. Vegetasi berperan penting sebagai penyerap polusi.<br>
-            🔥 <b>Luas Kebakaran Hutan dan Lahan (ha) →</b> meski tidak linier, titik ekstrem dengan area terbakar luas terlihat menekan kualitas udara. Karhutla menjadi faktor episodik dengan dampak signifikan saat terjadi.<br>
-            🚗 <b>Jumlah Kendaraan Bermotor (unit) →</b> tren negatif jelas: semakin banyak kendaraan, kualitas udara menurun. Konsisten dengan fakta bahwa transportasi adalah sumber emisi terbesar di kota besar.<br>
-            ⚡ <b>Persentase Rumah Tangga Listrik PLN (%) →</b> mayoritas provinsi sudah di atas 90%. Variabel ini lebih merefleksikan infrastruktur energi dan pola konsumsi, yang secara tidak langsung berkaitan dengan emisi.
-    """, unsafe_allow_html=True)
+    for i in range(0, len(faktor_list), 2):
+        for faktor, col in zip(faktor_list[i:i + 2], st.columns(2)):
+            with col:
+                st.markdown(f"**{features_fullname[faktor]} vs {features_fullname['Prediksi_IKU']}**")
+                fig = cached_figure(f"tab3_scatter_{faktor}_{tahun}", data_version, build_scatter, faktor)
+                st.plotly_chart(fig, use_container_width=True)
+
+    if narasi:
+        st.markdown("""
+            <style>
+                .no-white-block {
+                    background: linear-gradient(135deg, #8B5E3C, #A47551);
+                    color: white;
+                    border-radius: 12px;
+                    font-size: 14px;
+                    padding: 12px;
+                    margin-top: 10px;
+                    box-shadow: 0 2px 6px rgba(0,0,0,0.15);
+                    text-align: justify;
+                }
+            </style>
+            <div class="no-white-block">
+                🌳 <b>Indeks Kualitas Tutupan Lahan (%) →</b> pola positif: provinsi dengan tutupan lahan tinggi cenderung memiliki kualitas udara lebih baik. Vegetasi berperan penting sebagai penyerap polusi.<br>
+                🔥 <b>Luas Kebakaran Hutan dan Lahan (ha) →</b> meski tidak linier, titik ekstrem dengan area terbakar luas terlihat menekan kualitas udara. Karhutla menjadi faktor episodik dengan dampak signifikan saat terjadi.<br>
+                🚗 <b>Jumlah Kendaraan Bermotor (unit) →</b> tren negatif jelas: semakin banyak kendaraan, kualitas udara menurun. Konsisten dengan fakta bahwa transportasi adalah sumber emisi terbesar di kota besar.<br>
+                ⚡ <b>Persentase Rumah Tangga Listrik PLN (%) →</b> mayoritas provinsi sudah di atas 90%. Variabel ini lebih merefleksikan infrastruktur energi dan pola konsumsi, yang secara tidak langsung berkaitan dengan emisi.
+        """, unsafe_allow_html=True)
 
     # Insight utama setelah scatter plot
-    st.markdown("""
-    <div style="margin-top:12px; padding:12px; background-color:#f0f0f0; 
-                color:#333; border-radius:10px; font-size:14px; 
-                box-shadow: 0 0 5px rgba(0,0,0,0.05); text-align: justify;">
-        ✨ <b>Insight utama:</b> Scatter plot menegaskan bahwa <b>kendaraan bermotor</b> dan <b>tutupan lahan</b> paling berpengaruh terhadap kualitas udara. 
-                <b>Karhutla</b> berdampak besar hanya pada kasus ekstrem, sementara akses listrik tidak signifikan. 
-                Fokus utama kebijakan sebaiknya pada <b>pengendalian emisi transportasi</b> dan <b>perlindungan ekosistem hijau</b>.
-    </div>
-    """, unsafe_allow_html=True) 
+    if narasi:
+        st.markdown("""
+        <div style="margin-top:12px; padding:12px; background-color:#f0f0f0; 
+                    color:#333; border-radius:10px; font-size:14px; 
+                    box-shadow: 0 0 5px rgba(0,0,0,0.05); text-align: justify;">
+            ✨ <b>Insight utama:</b> Scatter plot menegaskan bahwa <b>kendaraan bermotor</b> dan <b>tutupan lahan</b> paling berpengaruh terhadap kualitas udara. 
+                    <b>Karhutla</b> berdampak besar hanya pada kasus ekstrem, sementara akses listrik tidak signifikan. 
+                    Fokus utama kebijakan sebaiknya pada <b>pengendalian emisi transportasi</b> dan <b>perlindungan ekosistem hijau</b>.
+        </div>
+        """, unsafe_allow_html=True) 
 
     st.markdown("<br>", unsafe_allow_html=True) 
 
     # ---------------------------------
     # Feature Importance
     # ---------------------------------
-    st.markdown('<div class="gradient-subheader-tab3">Feature Importance dengan Random Forest (2022)</div>', unsafe_allow_html=True)
+    sw.lap("importance")
+    st.markdown('<div class="gradient-subheader-tab3">Feature Importance dengan Random Forest (model aktif)</div>', unsafe_allow_html=True)
     st.caption("Grafik feature importance menunjukkan kontribusi relatif tiap faktor. Semakin besar skor, semakin kuat pengaruhnya terhadap prediksi IKU.")
 
     # Ambil hanya fitur yang dipakai di RF (exclude 'Prediksi_IKU')
     features_for_rf = {k:v for k,v in features_fullname.items() if k != "Prediksi_IKU"}
 
-    importances = rf_model.feature_importances_
-    feat_imp = pd.Series(importances, index=list(features_for_rf.values())).sort_values(ascending=True)
-
-    # Plot horizontal bar chart
-    fig = go.Figure(go.Bar(
-        x=feat_imp.values,
-        y=feat_imp.index,
-        orientation='h',
-        marker=dict(color=feat_imp.values, colorscale=[[0, '#E2CEB1'], [1, "#804000"]], showscale=False)
-    ))
-    fig.update_layout(
-        xaxis_title="Importance Score",
-        yaxis_title="Fitur",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        margin=dict(t=20, l=80, r=20, b=5),
-        height=400
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-    st.markdown("""
-        <style>
-            .no-white-block {
-                background: linear-gradient(135deg, #8B5E3C, #A47551);
-                color: white;
-                border-radius: 12px;
-                font-size: 14px;
-                padding: 12px;
-                margin-top: 10px;
-                box-shadow: 0 2px 6px rgba(0,0,0,0.15);
-                text-align: justify;
-            }
-        </style>
-        <div class="no-white-block">
-            🚗 <b>Jumlah Kendaraan Bermotor</b> menempati posisi paling dominan. Ini konsisten dengan tren scatter plot dan top/bottom yang menunjukkan kota padat (Jakarta & Jawa) tertekan polusi transportasi.<br>
-            🌳 <b>Indeks Kualitas Tutupan Lahan</b> juga memiliki skor penting, mengonfirmasi peran vegetasi sebagai penyangga kualitas udara di wilayah dengan ekosistem masih terjaga (Papua & Maluku).<br>
-            🔥 <b>Karhutla</b> dan <b>akses listrik PLN</b> muncul dengan pengaruh lebih kecil, tetapi tetap signifikan pada kejadian ekstrem. Ini melengkapi insight scatter plot yang menilai karhutla sebagai faktor “kejutan” bukan tren harian.<br>
-            ⚡ <b>Persentase Rumah Tangga Listrik PLN (%)</b> memberikan kontribusi relatif rendah. Sejalan dengan analisis sebelumnya, variabel ini lebih merefleksikan pembangunan infrastruktur dasar, daripada faktor langsung pencemar udara.
-        </div>
-    """, unsafe_allow_html=True)
+    def build_importance():
+        # Dari artefak forest (mmap), tanpa memuat model sklearn
+        importances = load_compiled_model(model.model_path).feature_importances
+        feat_imp = pd.Series(importances, index=list(features_for_rf.values())).sort_values(ascending=True)
+
+        # Plot horizontal bar chart
+        fig = go.Figure(go.Bar(
+            x=feat_imp.values,
+            y=feat_imp.index,
+            orientation='h',
+            marker=dict(color=feat_imp.values, colorscale=[[0, '#E2CEB1'], [1, "#804000"]], showscale=False)
+        ))
+        fig.update_layout(
+            xaxis_title="Importance Score",
+            yaxis_title="Fitur",
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=20, l=80, r=20, b=5),
+            height=400
+        )
+        return fig
+
+    model_version = file_signature(model.model_path)[2][:16]
+    st.plotly_chart(cached_figure("tab3_importance", model_version, build_importance), use_container_width=True)
+
+    if narasi:
+        st.markdown("""
+            <style>
+                .no-white-block {
+                    background: linear-gradient(135deg, #8B5E3C, #A47551);
+                    color: white;
+                    border-radius: 12px;
+                    font-size: 14px;
+                    padding: 12px;
+                    margin-top: 10px;
+                    box-shadow: 0 2px 6px rgba(0,0,0,0.15);
+                    text-align: justify;
+                }
+            </style>
+            <div class="no-white-block">
+                🚗 <b>Jumlah Kendaraan Bermotor</b> menempati posisi paling dominan. Ini konsisten dengan tren scatter plot dan top/bottom yang menunjukkan kota padat (Jakarta & Jawa) tertekan polusi transportasi.<br>
+                🌳 <b>Indeks Kualitas Tutupan Lahan</b> juga memiliki skor penting, mengonfirmasi peran vegetasi sebagai penyangga kualitas udara di wilayah dengan ekosistem masih terjaga (Papua & Maluku).<br>
+                🔥 <b>Karhutla</b> dan <b>akses listrik PLN</b> muncul dengan pengaruh lebih kecil, tetapi tetap signifikan pada kejadian ekstrem. Ini melengkapi insight scatter plot yang menilai karhutla sebagai faktor “kejutan” bukan tren harian.<br>
+                ⚡ <b>Persentase Rumah Tangga Listrik PLN (%)</b> memberikan kontribusi relatif rendah. Sejalan dengan analisis sebelumnya, variabel ini lebih merefleksikan pembangunan infrastruktur dasar, daripada faktor langsung pencemar udara.
+            </div>
+        """, unsafe_allow_html=True)
 
     # Insight utama setelah feature importance
-    st.markdown("""
-    <div style="margin-top:12px; padding:12px; background-color:#f0f0f0; 
-                color:#333; border-radius:10px; font-size:14px; 
-                box-shadow: 0 0 5px rgba(0,0,0,0.05); text-align: justify;">
-        ✨ <b>Insight utama:</b> Feature importance menegaskan kendaraan bermotor dan tutupan lahan sebagai dua faktor paling krusial, selaras dengan temuan peta dan scatter plot. 
-                Sementara karhutla dan akses listrik tetap relevan sebagai konteks tambahan. Hal ini memperkuat dasar kebijakan: 
-                <b>prioritas pengendalian emisi transportasi + perlindungan ekosistem hijau.</b>
-    </div>
-    """, unsafe_allow_html=True)
+    if narasi:
+        st.markdown("""
+        <div style="margin-top:12px; padding:12px; background-color:#f0f0f0; 
+                    color:#333; border-radius:10px; font-size:14px; 
+                    box-shadow: 0 0 5px rgba(0,0,0,0.05); text-align: justify;">
+            ✨ <b>Insight utama:</b> Feature importance menegaskan kendaraan bermotor dan tutupan lahan sebagai dua faktor paling krusial, selaras dengan temuan peta dan scatter plot. 
+                    Sementara karhutla dan akses listrik tetap relevan sebagai konteks tambahan. Hal ini memperkuat dasar kebijakan: 
+                    <b>prioritas pengendalian emisi transportasi + perlindungan ekosistem hijau.</b>
+        </div>
+        """, unsafe_allow_html=True)
 
     st.markdown("<br>", unsafe_allow_html=True) 
 
     # ---------------------------------
     # Heatmap Korelasi Fitur
     # ---------------------------------
-    st.markdown('<div class="gradient-subheader-tab3">Heatmap Korelasi Fitur (2022)</div>', unsafe_allow_html=True)
+    sw.lap("korelasi")
+    st.markdown(f'<div class="gradient-subheader-tab3">Heatmap Korelasi Fitur ({tahun})</div>', unsafe_allow_html=True)
     st.caption("Heatmap korelasi digunakan sebagai validasi statistik: apakah hubungan antar variabel sejalan dengan tren scatter plot dan feature importance.")
 
     features_fullname["Prediksi_IKU"] = "Prediksi Indeks Kualitas Udara"
-    corr = df_hot[list(features_fullname.keys())].corr().round(2)
-    colorscale = [[0.0, "#804000"], [0.5, "#f0f0f0"], [1.0, "#E2CEB1"]]
-    fig_corr = px.imshow(corr, text_auto=True, aspect="auto", color_continuous_scale=colorscale)
-    col_names = list(features_fullname.keys())
-    display_names = [features_fullname[c] for c in col_names]
-    fig_corr.update_xaxes(ticktext=display_names, tickvals=list(range(len(display_names))))
-    fig_corr.update_yaxes(ticktext=display_names, tickvals=list(range(len(display_names))))
-    fig_corr.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', margin=dict(t=25, l=80, r=20, b=5), height=500)
-    st.plotly_chart(fig_corr, use_container_width=True)
 
-    st.markdown("""
-        <style>
-            .no-white-block {
-                background: linear-gradient(135deg, #8B5E3C, #A47551);
-                color: white;
-                border-radius: 12px;
-                font-size: 14px;
-                padding: 12px;
-                margin-top: 10px;
-                box-shadow: 0 2px 6px rgba(0,0,0,0.15);
-                text-align: justify;
-            }
-        </style>
-        <div class="no-white-block">
-            🌳 <b>Indeks Kualitas Tutupan Lahan ↔ IKU (r= +0.74)</b> → validasi kuat bahwa tutupan lahan berperan positif menjaga kualitas udara.<br>
-            🚗 <b>Jumlah Kendaraan Bermotor ↔ IKU (r= -0.76)</b> → konsisten menjadi faktor tekanan terbesar terhadap kualitas udara, menguatkan hasil feature importance.<br>
-            ⚡ <b>Rumah Tangga Listrik PLN ↔ IKU (r= -0.42)</b> → korelasi moderat, merepresentasikan dinamika konsumsi energi rumah tangga yang ikut memengaruhi kualitas udara.<br>
-            🔥 <b>Luas Karhutla ↔ IKU (r= +0.10)</b> → hubungan lemah secara statistik, wajar karena kejadian karhutla bersifat insidental/episodik dalam data tahunan, tetapi tetap relevan sebagai faktor risiko.
-        </div>
-    """, unsafe_allow_html=True)
+    def build_corr():
+        corr = df_hot[list(features_fullname.keys())].corr().round(2)
+        colorscale = [[0.0, "#804000"], [0.5, "#f0f0f0"], [1.0, "#E2CEB1"]]
+        fig_corr = px.imshow(corr, text_auto=True, aspect="auto", color_continuous_scale=colorscale)
+        col_names = list(features_fullname.keys())
+        display_names = [features_fullname[c] for c in col_names]
+        fig_corr.update_xaxes(ticktext=display_names, tickvals=list(range(len(display_names))))
+        fig_corr.update_yaxes(ticktext=display_names, tickvals=list(range(len(display_names))))
+        fig_corr.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', margin=dict(t=25, l=80, r=20, b=5), height=500)
+        return fig_corr
+
+    st.plotly_chart(cached_figure(f"tab3_corr_{tahun}", data_version, build_corr), use_container_width=True)
+
+    if narasi:
+        st.markdown("""
+            <style>
+                .no-white-block {
+                    background: linear-gradient(135deg, #8B5E3C, #A47551);
+                    color: white;
+                    border-radius: 12px;
+                    font-size: 14px;
+                    padding: 12px;
+                    margin-top: 10px;
+                    box-shadow: 0 2px 6px rgba(0,0,0,0.15);
+                    text-align: justify;
+                }
+            </style>
+            <div class="no-white-block">
+                🌳 <b>Indeks Kualitas Tutupan Lahan ↔ IKU (r= +0.74)</b> → validasi kuat bahwa tutupan lahan berperan positif menjaga kualitas udara.<br>
+                🚗 <b>Jumlah Kendaraan Bermotor ↔ IKU (r= -0.76)</b> → konsisten menjadi faktor tekanan terbesar terhadap kualitas udara, menguatkan hasil feature importance.<br>
+                ⚡ <b>Rumah Tangga Listrik PLN ↔ IKU (r= -0.42)</b> → korelasi moderat, merepresentasikan dinamika konsumsi energi rumah tangga yang ikut memengaruhi kualitas udara.<br>
+                🔥 <b>Luas Karhutla ↔ IKU (r= +0.10)</b> → hubungan lemah secara statistik, wajar karena kejadian karhutla bersifat insidental/episodik dalam data tahunan, tetapi tetap relevan sebagai faktor risiko.
+            </div>
+        """, unsafe_allow_html=True)
 
      # Insight utama setelah heatmap
-    st.markdown("""
-    <div style="margin-top:12px; padding:12px; background-color:#f0f0f0; 
-                color:#333; border-radius:10px; font-size:14px; 
-                box-shadow: 0 0 5px rgba(0,0,0,0.05); text-align: justify;">
-        ✨ <b>Insight utama:</b> Heatmap menegaskan konsistensi hubungan antar faktor. 
-    <b>Kendaraan</b> dan <b>tutupan lahan</b> muncul paling kuat dan stabil, 
-    sedangkan <b>listrik</b> dan <b>karhutla</b> memberi konteks tambahan yang melengkapi analisis. 
-    Tidak ada variabel yang terabaikan; masing-masing berkontribusi sesuai karakteristik datanya.
-    </div>
-    """, unsafe_allow_html=True)
+    if narasi:
+        st.markdown("""
+        <div style="margin-top:12px; padding:12px; background-color:#f0f0f0; 
+                    color:#333; border-radius:10px; font-size:14px; 
+                    box-shadow: 0 0 5px rgba(0,0,0,0.05); text-align: justify;">
+            ✨ <b>Insight utama:</b> Heatmap menegaskan konsistensi hubungan antar faktor. 
+        <b>Kendaraan</b> dan <b>tutupan lahan</b> muncul paling kuat dan stabil, 
+        sedangkan <b>listrik</b> dan <b>karhutla</b> memberi konteks tambahan yang melengkapi analisis. 
+        Tidak ada variabel yang terabaikan; masing-masing berkontribusi sesuai karakteristik datanya.
+        </div>
+        """, unsafe_allow_html=True)
 
     # ---------------------------------
     # Call to Action / Penutup
@@ -443,3 +565,4 @@ def show_tab():
         <i>🚀 Terima kasih telah menggunakan dashboard ini — semoga menjadi pijakan untuk keputusan yang lebih visioner dan berkelanjutan!</i>
     </div>
     """, unsafe_allow_html=True)
+    sw.stop()
@@ -0,0 +1,9 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import streamlit.logger
+streamlit.logger.set_log_level("error")
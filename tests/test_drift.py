@@ -0,0 +1,88 @@
+# tests/test_drift.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.drift import (DriftAccumulator, TrainingStats, bin_counts, check_batch, flag_labels,
+                         psi_level, quantile_grid, range_flags)
+from utils.helpers import features
+
+rng = np.random.default_rng(0)
+scale = np.array([10.0, 1000.0, 1e6, 5.0])
+
+def _frame(X: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame(X, columns=features)
+
+@pytest.fixture(scope="module")
+def latih() -> np.ndarray:
+    return rng.normal(size=(5000, len(features))) * scale + 3 * scale
+
+@pytest.fixture(scope="module")
+def stats(latih) -> TrainingStats:
+    edges = np.quantile(latih, quantile_grid, axis=0).T
+    return TrainingStats(version="test", n=len(latih), lo=latih.min(axis=0), hi=latih.max(axis=0),
+                         edges=edges, expected=bin_counts(latih, edges) / len(latih))
+
+def test_bin_counts_nilai_di_luar_range_masuk_bin_ujung(stats):
+    X = np.vstack([stats.lo - 1, stats.hi + 1])
+    counts = bin_counts(X, stats.edges)
+    assert counts.shape == (len(features), 100)
+    assert np.all(counts[:, 0] == 1) and np.all(counts[:, -1] == 1)
+    assert counts.sum() == X.size
+
+def test_batch_identik_tanpa_drift(latih, stats):
+    summary = check_batch(_frame(latih), stats).summary
+    np.testing.assert_allclose(summary["PSI"], 0.0, atol=1e-12)
+    np.testing.assert_allclose(summary["KS"], 0.0, atol=1e-12)
+    assert (summary["Level_PSI"] == "Stabil").all()
+    assert not summary["Drift_KS"].any()
+    assert (summary["Di_Luar_Range"] == 0).all()
+    assert (summary["N"] == len(latih)).all()
+
+def test_sampel_baru_distribusi_sama_stabil(stats):
+    X = rng.normal(size=(2000, len(features))) * scale + 3 * scale
+    summary = check_batch(_frame(X), stats).summary
+    assert (summary["PSI"] < 0.1).all()
+    assert not summary["Drift_KS"].any()
+
+def test_batch_bergeser_terdeteksi(stats):
+    X = rng.normal(size=(2000, len(features))) * scale + 4 * scale
+    summary = check_batch(_frame(X), stats).summary
+    assert (summary["Level_PSI"] == "Signifikan").all()
+    assert summary["Drift_KS"].all()
+    assert (summary["KS"] > summary["KS_Kritis"]).all()
+
+def test_ks_grid_mendekati_ks_eksak(latih, stats):
+    ks_2samp = pytest.importorskip("scipy.stats").ks_2samp
+    X = rng.normal(size=(2000, len(features))) * scale + 3.3 * scale
+    summary = check_batch(_frame(X), stats).summary
+    for j, col in enumerate(features):
+        exact = ks_2samp(X[:, j], latih[:, j]).statistic
+        assert abs(summary.loc[col, "KS"] - exact) <= 0.01 + 1e-9
+
+def test_flag_dan_hitungan_di_luar_range(latih, stats):
+    X = latih[:10].copy()
+    X[0, 0] = stats.lo[0] - 1
+    X[1, 0] = stats.hi[0] + 1
+    X[1, 2] = stats.hi[2] + 1
+    report = check_batch(_frame(X), stats)
+
+    np.testing.assert_array_equal(report.summary["Di_Luar_Range"], [2, 0, 1, 0])
+    np.testing.assert_array_equal(report.flags.to_numpy(), range_flags(X, stats))
+    assert report.ekstrapolasi.tolist() == [True, True] + [False] * 8
+    labels = flag_labels(report.flags.to_numpy())
+    assert labels[0] == features[0]
+    assert labels[1] == f"{features[0]};{features[2]}"
+    assert labels[2] == ""
+
+def test_akumulator_sama_dengan_satu_batch(stats):
+    X = rng.normal(size=(3000, len(features))) * scale + 3.5 * scale
+    acc = DriftAccumulator(stats)
+    for chunk in np.array_split(X, 7):
+        acc.add(bin_counts(chunk, stats.edges), range_flags(chunk, stats).sum(axis=0))
+    pd.testing.assert_frame_equal(acc.summary(), check_batch(_frame(X), stats).summary)
+
+@pytest.mark.parametrize("psi, level", [(0.0, "Stabil"), (0.0999, "Stabil"), (0.1, "Sedang"),
+                                        (0.2499, "Sedang"), (0.25, "Signifikan"), (3.0, "Signifikan")])
+def test_psi_level(psi, level):
+    assert psi_level(psi) == level
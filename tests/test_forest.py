@@ -0,0 +1,35 @@
+# tests/test_forest.py
+#   python -m pytest -q tests
+import numpy as np
+import pytest
+
+from utils.forest import compile_forest, load_compiled, save_compiled, verify_compiled
+from utils.helpers import MODEL_PATH, features, load_hot, load_latih, load_model
+
+pytestmark = pytest.mark.skipif(not MODEL_PATH.exists(), reason="model .pkl tidak tersedia")
+
+@pytest.fixture(scope="module")
+def model():
+    return load_model()
+
+@pytest.fixture(scope="module")
+def forest(model):
+    return compile_forest(model, features)
+
+@pytest.mark.parametrize("load", [load_latih, load_hot], ids=["df_latih", "df_hot"])
+def test_compiled_sama_dengan_sklearn(model, forest, load):
+    X = load()[features]
+    np.testing.assert_allclose(forest.predict(X.to_numpy()), model.predict(X), rtol=1e-9, atol=0)
+    assert verify_compiled(model, forest, X) <= 1e-9
+
+def test_simpan_muat_mmap(model, forest, tmp_path):
+    X = load_hot()[features].to_numpy(dtype=np.float64)
+    save_compiled(forest, tmp_path / "forest")
+    loaded = load_compiled(tmp_path / "forest", mmap=True)
+
+    assert isinstance(loaded.value, np.memmap)
+    assert loaded.feature_names == forest.feature_names
+    assert loaded.max_depth == forest.max_depth
+    np.testing.assert_array_equal(loaded.feature_importances, model.feature_importances_)
+    np.testing.assert_array_equal(loaded.predict_trees(X), forest.predict_trees(X))
+    np.testing.assert_array_equal(loaded.predict(X), forest.predict(X))
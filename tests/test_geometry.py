@@ -0,0 +1,84 @@
+# tests/test_geometry.py
+import numpy as np
+import pytest
+
+from utils.geometry import TOPO_OBJECT, douglas_peucker, geojson_to_topojson
+from utils.helpers import GEOJSON_PATH, load_geojson
+
+def _square(x0, y0, x1, y1):
+    return {"type": "Polygon", "coordinates": [[[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]]}
+
+def _feature(geometry, name):
+    return {"type": "Feature", "properties": {"name": name}, "geometry": geometry}
+
+def _decode_arcs(topo) -> list:
+    """Delta-decode arc ke koordinat grid absolut"""
+    return [np.cumsum(np.asarray(arc, dtype=np.int64), axis=0) for arc in topo["arcs"]]
+
+def _ring(arcs, ids) -> np.ndarray:
+    parts = [arcs[i] if i >= 0 else arcs[~i][::-1] for i in ids]
+    return np.vstack([parts[0]] + [p[1:] for p in parts[1:]])
+
+def test_arc_bersama_dua_poligon_bertetangga():
+    # Dua persegi yang berbagi sisi x = 1
+    geojson = {"type": "FeatureCollection", "features": [
+        _feature(_square(0, 0, 1, 1), "A"),
+        _feature(_square(1, 0, 2, 1), "B"),
+    ]}
+    topo = geojson_to_topojson(geojson, quantization=3)
+    geoms = topo["objects"][TOPO_OBJECT]["geometries"]
+    assert [g["properties"]["name"] for g in geoms] == ["A", "B"]
+
+    ids_a = {i if i >= 0 else ~i for i in geoms[0]["arcs"][0][0]}
+    ids_b = {i if i >= 0 else ~i for i in geoms[1]["arcs"][0][0]}
+    shared = ids_a & ids_b
+    assert len(shared) == 1
+    # Sisi bersama dilalui berlawanan arah oleh kedua poligon
+    arc_id = shared.pop()
+    assert {arc_id, ~arc_id} <= set(geoms[0]["arcs"][0][0]) | set(geoms[1]["arcs"][0][0])
+    assert len(topo["arcs"]) == 3
+
+def test_decode_kembali_ke_koordinat_terkuantisasi():
+    geojson = load_geojson(GEOJSON_PATH)
+    topo = geojson_to_topojson(geojson)
+    arcs = _decode_arcs(topo)
+    (kx, ky), (x0, y0) = topo["transform"]["scale"], topo["transform"]["translate"]
+
+    for f, g in zip(geojson["features"], topo["objects"][TOPO_OBJECT]["geometries"]):
+        # Poligon pertama, ring luar: titik hasil decode = titik asli dalam setengah sel grid
+        ring = _ring(arcs, g["arcs"][0][0])
+        assert np.array_equal(ring[0], ring[-1])
+        coords = ring * [kx, ky] + [x0, y0]
+        original = np.asarray(f["geometry"]["coordinates"][0][0] if f["geometry"]["type"] == "MultiPolygon"
+                              else f["geometry"]["coordinates"][0], dtype=np.float64)[:, :2]
+        dist = np.abs(coords[:, None, :] - original[None, :, :]).max(axis=2).min(axis=1)
+        assert np.all(dist <= np.array([kx, ky]).max() / 2 + 1e-9)
+
+def test_simplifikasi_mengurangi_arc_tanpa_mengubah_topologi():
+    geojson = load_geojson(GEOJSON_PATH)
+    full = geojson_to_topojson(geojson)
+    coarse = geojson_to_topojson(geojson, zoom=4)
+    assert len(coarse["arcs"]) == len(full["arcs"])
+    assert sum(map(len, coarse["arcs"])) < sum(map(len, full["arcs"]))
+    assert ([g["arcs"] for g in coarse["objects"][TOPO_OBJECT]["geometries"]]
+            == [g["arcs"] for g in full["objects"][TOPO_OBJECT]["geometries"]])
+
+def test_douglas_peucker():
+    line = np.array([[0, 0], [1, 0.1], [2, -0.1], [3, 5], [4, 6], [5, 7.1], [6, 8]])
+    simplified = douglas_peucker(line, 0.5)
+    np.testing.assert_array_equal(simplified[0], line[0])
+    np.testing.assert_array_equal(simplified[-1], line[-1])
+    assert len(simplified) < len(line)
+    # Titik dengan simpangan > toleransi dipertahankan
+    assert any(np.array_equal(p, [3, 5]) for p in simplified)
+    # Toleransi 0 → tidak ada simplifikasi
+    assert douglas_peucker(line, 0) is line
+
+@pytest.mark.parametrize("n", [5, 50])
+def test_douglas_peucker_ring_tertutup_tetap_poligon(n):
+    t = np.linspace(0, 2 * np.pi, n)
+    ring = np.c_[np.cos(t), np.sin(t)]
+    ring[-1] = ring[0]
+    simplified = douglas_peucker(ring, 10.0)
+    assert len(simplified) >= 4
+    assert np.array_equal(simplified[0], simplified[-1])
@@ -0,0 +1,139 @@
+# utils/choropleth.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import hashlib
+import os
+import pandas as pd
+import streamlit as st
+import folium
+from branca.colormap import linear
+from pathlib import Path
+from utils.helpers import DATA_DIR, GEOJSON_PATH
+from utils.perf import timed, cache_miss
+from utils.geometry import TOPO_OBJECT, load_topojson, topojson_key
+from utils.provinsi import add_kode_provinsi
+
+# ==============================
+# Lokasi cache peta (content-addressed)
+# ==============================
+MAP_CACHE_DIR = DATA_DIR / "cache" / "choropleth"
+
+# Naikkan jika cara membangun peta berubah, supaya cache lama tidak dipakai
+MAP_BUILD_VERSION = "3"
+
+# Zoom awal peta; juga menentukan tingkat simplifikasi geometri
+MAP_ZOOM = 5
+
+# ==============================
+# 1. Hash isi (prediksi + geometri)
+# ==============================
+def map_content_hash(df_pred: pd.DataFrame, geojson_path: Path = GEOJSON_PATH,
+                     zoom: int = MAP_ZOOM, single_layer: bool = True) -> str:
+    """Hash dari prediksi per provinsi, artefak TopoJSON, opsi layer dan versi builder"""
+    h = hashlib.sha256()
+    h.update(f"{MAP_BUILD_VERSION}|{single_layer}".encode())
+    h.update(topojson_key(zoom, geojson_path).encode())
+    h.update(df_pred[["Kode_Provinsi", "Prediksi_IKU"]].to_csv(index=False).encode())
+    return h.hexdigest()
+
+# ==============================
+# 2. Bangun peta (mahal, hanya saat cache miss)
+# ==============================
+def build_choropleth_html(df_pred: pd.DataFrame, topology: dict, single_layer: bool = True) -> str:
+    """Bangun HTML peta dari TopoJSON dengan properti tooltip sudah digabung.
+
+    `single_layer=True` mengirim geometri sekali saja (isi warna + tooltip dalam satu
+    layer); `False` mempertahankan susunan lama Choropleth + GeoJson.
+    """
+    geometries = topology['objects'][TOPO_OBJECT]['geometries']
+
+    # Cocokkan lewat kode provinsi kanonik (lihat utils.provinsi)
+    df_map = df_pred.dropna(subset=["Kode_Provinsi"])[["Kode_Provinsi", "Prediksi_IKU"]].copy()
+    df_map['Kode_Provinsi'] = df_map['Kode_Provinsi'].astype(int)
+    prov_to_pred = df_map.set_index('Kode_Provinsi')['Prediksi_IKU'].to_dict()
+
+    # Salin geometri (tanpa menyentuh arc) agar topology pemanggil tidak berubah
+    geometries_map = []
+    for geom in geometries:
+        pred_val = prov_to_pred.get(int(geom['properties']['kode']), None)
+        properties = {**geom['properties'],
+                      'Prediksi_IKU': f"{pred_val:.2f}" if pred_val is not None else "N/A"}
+        geometries_map.append({**geom, 'properties': properties})
+    topology_map = {**topology, 'objects': {TOPO_OBJECT: {**topology['objects'][TOPO_OBJECT],
+                                                          'geometries': geometries_map}}}
+
+    m = folium.Map(location=[-2.5, 118], zoom_start=MAP_ZOOM)
+    tooltip = folium.GeoJsonTooltip(
+        fields=['Propinsi', 'Prediksi_IKU'],
+        aliases=['Provinsi:', 'Prediksi IKU:'],
+        localize=True
+    )
+
+    if single_layer:
+        values = df_map['Prediksi_IKU']
+        colormap = linear.YlOrBr_06.scale(values.min(), values.max()).to_step(6)
+        colormap.caption = 'Prediksi IKU (%), Semakin Gelap Semakin Baik'
+
+        def style_function(feature):
+            pred_val = prov_to_pred.get(int(feature['properties']['kode']))
+            return {
+                'fillColor': colormap(pred_val) if pred_val is not None else 'black',
+                'fillOpacity': 0.7,
+                'color': 'black',
+                'weight': 1,
+                'opacity': 0.2,
+            }
+
+        folium.TopoJson(
+            topology_map,
+            f'objects.{TOPO_OBJECT}',
+            name='choropleth',
+            style_function=style_function,
+            tooltip=tooltip
+        ).add_to(m)
+        colormap.add_to(m)
+    else:
+        folium.Choropleth(
+            geo_data=topology_map,
+            topojson=f'objects.{TOPO_OBJECT}',
+            name='choropleth',
+            data=df_map,
+            columns=['Kode_Provinsi', 'Prediksi_IKU'],
+            key_on='feature.properties.kode',
+            fill_color='YlOrBr',
+            fill_opacity=0.7,
+            line_opacity=0.2,
+            legend_name='Prediksi IKU (%), Semakin Gelap Semakin Baik',
+        ).add_to(m)
+        folium.TopoJson(topology_map, f'objects.{TOPO_OBJECT}', tooltip=tooltip).add_to(m)
+    return m.get_root().render()
+
+# ==============================
+# 3. Cache memori + disk
+# ==============================
+@st.cache_data(show_spinner=False, max_entries=16)
+@cache_miss
+def _choropleth_html_cached(key: str, _df_pred: pd.DataFrame, geojson_path: str,
+                            zoom: int, single_layer: bool) -> str:
+    path = MAP_CACHE_DIR / f"{key}.html"
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+
+    html = build_choropleth_html(_df_pred, load_topojson(zoom, geojson_path), single_layer)
+
+    # Tulis atomik supaya proses lain tidak membaca file setengah jadi
+    MAP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(html, encoding="utf-8")
+    os.replace(tmp_path, path)
+    return html
+
+@timed("choropleth_html", cached=True)
+def choropleth_html(df_pred: pd.DataFrame, geojson_path: Path = GEOJSON_PATH,
+                    zoom: int = MAP_ZOOM, single_layer: bool = True) -> str:
+    """HTML peta choropleth, dibangun sekali per hash (prediksi, geometri, opsi)"""
+    if "Kode_Provinsi" not in df_pred.columns:
+        df_pred = add_kode_provinsi(df_pred)
+    key = map_content_hash(df_pred, geojson_path, zoom, single_layer)
+    return _choropleth_html_cached(key, df_pred, str(geojson_path), zoom, single_layer)
@@ -0,0 +1,153 @@
+# utils/drift.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import hashlib
+import numpy as np
+import pandas as pd
+import streamlit as st
+from dataclasses import dataclass
+from utils.helpers import features, file_signature, load_csv
+from utils.registry import active_model
+from utils.perf import timed, cache_miss
+
+# ==============================
+# Drift input & deteksi ekstrapolasi (vektor, per batch)
+# ==============================
+# Statistik data latih disimpan sebagai hitungan bin pada grid persentil 1%.
+# Hitungan bin bisa dijumlah antar potongan, jadi skoring streaming (score.py)
+# cukup mengakumulasi array kecil (n_fitur, 100) lalu menghitung skor di akhir.
+# Satu sumber per versi model (ModelVersion): range = input_ranges di meta.json,
+# sebaran = CSV data latih versi itu; dipakai sama oleh api.py, score.py dan tab2/tab3.
+quantile_grid = np.linspace(0.0, 1.0, 101)   # tepi bin: persentil 0, 1, ..., 100
+psi_bins = 10                                # PSI dihitung per desil (gabungan 10 bin grid)
+psi_eps = 1e-4                               # proporsi minimum (hindari log 0)
+psi_levels = [(0.1, "Stabil"), (0.25, "Sedang"), (np.inf, "Signifikan")]
+ks_alpha_c = 1.358                           # konstanta nilai kritis KS dua sampel, alpha 0.05
+
+@dataclass(frozen=True)
+class TrainingStats:
+    """Statistik per fitur dari data latih satu versi model (read-only, dibagi antar sesi)"""
+    version: str
+    n: int
+    lo: np.ndarray           # (n_fitur,) batas bawah range data latih (input_ranges versi model)
+    hi: np.ndarray           # (n_fitur,) batas atas range data latih
+    edges: np.ndarray        # (n_fitur, 101) nilai persentil 0..100
+    expected: np.ndarray     # (n_fitur, 100) proporsi data latih per bin grid
+
+@dataclass(frozen=True)
+class DriftReport:
+    """Hasil cek satu batch: flag per baris & fitur + skor drift per fitur"""
+    flags: pd.DataFrame      # bool (n_baris, n_fitur): di luar range data latih versi model
+    summary: pd.DataFrame    # per fitur: PSI, Level_PSI, KS, KS_Kritis, Drift_KS, Di_Luar_Range
+
+    @property
+    def ekstrapolasi(self) -> pd.Series:
+        """True untuk baris dengan minimal satu fitur di luar range data latih"""
+        return self.flags.any(axis=1)
+
+def _matrix(df: pd.DataFrame) -> np.ndarray:
+    missing = [col for col in features if col not in df.columns]
+    if missing:
+        raise KeyError(f"Kolom fitur tidak ditemukan: {missing}")
+    return df[features].to_numpy(dtype=np.float64)
+
+# ==============================
+# 1. Statistik data latih
+# ==============================
+def bin_counts(X: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Hitungan per bin grid (n_fitur, 100); nilai di luar range masuk bin ujung"""
+    n_bins = edges.shape[1] - 1
+    counts = np.empty((X.shape[1], n_bins), dtype=np.int64)
+    for j in range(X.shape[1]):   # satu searchsorted per fitur, bukan per nilai
+        idx = np.searchsorted(edges[j, 1:-1], X[:, j], side="right")
+        counts[j] = np.bincount(idx, minlength=n_bins)
+    return counts
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+@cache_miss
+def _training_stats_cached(path: str, mtime_ns: int, digest: str, ranges: tuple) -> TrainingStats:
+    X = _matrix(load_csv(path))
+    edges = np.quantile(X, quantile_grid, axis=0).T
+    counts = bin_counts(X, edges)
+    lo, hi = np.array(ranges, dtype=np.float64).T
+    version = hashlib.sha256(f"{digest}{ranges}".encode()).hexdigest()[:16]
+    return TrainingStats(version=version, n=len(X), lo=lo, hi=hi, edges=edges, expected=counts / len(X))
+
+@timed("training_stats", cached=True)
+def training_stats(model=None) -> TrainingStats:
+    """Statistik data latih versi model (default: aktif), dihitung sekali per isi file + range"""
+    model = active_model() if model is None else model
+    ranges = tuple(tuple(float(v) for v in model.input_ranges[col]) for col in features)
+    return _training_stats_cached(*file_signature(model.training_data), ranges)
+
+# ==============================
+# 2. Flag per baris & skor drift per fitur
+# ==============================
+def range_flags(X: np.ndarray, stats: TrainingStats) -> np.ndarray:
+    """Mask (n_baris, n_fitur): True jika nilai di luar range data latih versi model"""
+    return (X < stats.lo) | (X > stats.hi)
+
+def out_of_range(df: pd.DataFrame, stats: TrainingStats = None) -> pd.DataFrame:
+    """range_flags sebagai DataFrame (kolom = fitur, index = index df)"""
+    stats = training_stats() if stats is None else stats
+    return pd.DataFrame(range_flags(_matrix(df), stats), columns=features, index=df.index)
+
+def flag_labels(flags: np.ndarray, names: list = features) -> np.ndarray:
+    """Nama fitur yang ter-flag per baris ("a;b"), lewat tabel 2^n_fitur kombinasi (tanpa loop per baris)"""
+    flags = np.asarray(flags, dtype=bool)
+    table = np.array([";".join(name for j, name in enumerate(names) if mask >> j & 1)
+                      for mask in range(1 << len(names))], dtype=object)
+    return table[flags.astype(np.int64) @ (1 << np.arange(len(names), dtype=np.int64))]
+
+def psi_level(psi: float) -> str:
+    return next(label for limit, label in psi_levels if psi < limit)
+
+def drift_scores(counts: np.ndarray, n_out: np.ndarray, stats: TrainingStats) -> pd.DataFrame:
+    """Skor per fitur dari hitungan bin batch baru.
+
+    PSI per desil data latih; KS = selisih maks CDF di grid persentil 1%
+    (selisih dengan KS eksak <= 0.01), dibandingkan nilai kritis alpha 0.05.
+    """
+    n = int(counts[0].sum())
+    actual = counts / max(n, 1)
+    coarse = lambda p: p.reshape(p.shape[0], psi_bins, -1).sum(axis=2)
+    a = np.clip(coarse(actual), psi_eps, None)
+    e = np.clip(coarse(stats.expected), psi_eps, None)
+    psi = ((a - e) * np.log(a / e)).sum(axis=1)
+
+    ks = np.abs(np.cumsum(actual, axis=1) - np.cumsum(stats.expected, axis=1)).max(axis=1)
+    ks_crit = ks_alpha_c * np.sqrt((n + stats.n) / (n * stats.n)) if n else np.inf
+    return pd.DataFrame({
+        "PSI": psi,
+        "Level_PSI": [psi_level(v) for v in psi],
+        "KS": ks,
+        "KS_Kritis": ks_crit,
+        "Drift_KS": ks > ks_crit,
+        "Di_Luar_Range": np.asarray(n_out, dtype=np.int64),
+        "N": n,
+    }, index=pd.Index(features, name="Fitur"))
+
+@timed("check_batch")
+def check_batch(df: pd.DataFrame, stats: TrainingStats = None) -> DriftReport:
+    """Cek seluruh batch sekaligus: flag ekstrapolasi per baris + PSI/KS per fitur"""
+    stats = training_stats() if stats is None else stats
+    X = _matrix(df)
+    flags = range_flags(X, stats)
+    summary = drift_scores(bin_counts(X, stats.edges), flags.sum(axis=0), stats)
+    return DriftReport(flags=pd.DataFrame(flags, columns=features, index=df.index), summary=summary)
+
+class DriftAccumulator:
+    """Akumulasi hitungan bin antar potongan (skoring streaming); skor dihitung di akhir"""
+
+    def __init__(self, stats: TrainingStats):
+        self.stats = stats
+        self.counts = np.zeros_like(stats.expected, dtype=np.int64)
+        self.n_out = np.zeros(len(features), dtype=np.int64)
+
+    def add(self, counts: np.ndarray, n_out: np.ndarray):
+        self.counts += counts
+        self.n_out += n_out
+
+    def summary(self) -> pd.DataFrame:
+        return drift_scores(self.counts, self.n_out, self.stats)
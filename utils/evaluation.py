@@ -0,0 +1,192 @@
+# utils/evaluation.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from dataclasses import dataclass
+from pathlib import Path
+
+if __name__ == "__main__":
+    # CLI tanpa runtime Streamlit: sembunyikan peringatan "No runtime found" saat import
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+
+from utils.helpers import (DF_LATIH_PATH, DF_HOT_PATH, CACHE_DIR, load_compiled_model, load_csv,
+                           rf_predict_batch)
+from utils.registry import active_model
+from utils.results import hot_results, model_data_version
+from utils.perf import timed, cache_miss
+
+# ==============================
+# Evaluasi langsung dari prediksi model yang dimuat
+# ==============================
+# Metrik hot test (data yang tidak pernah dilihat model) selalu dihitung ulang per
+# versi model+data (vektor, satu batch prediksi). Train/test hanya dihitung ulang
+# jika meta.json versi model mencatat split yang benar-benar dipakai saat training;
+# tanpa itu angka train/test diambil dari artefak metrik (eval_metrics.json /
+# metrics.json), karena split ulang df_latih akan memuat baris yang ikut dilatih.
+target = "Indeks_Kualitas_Udara_(%)"
+
+# Interval kepercayaan bootstrap
+n_bootstrap = 1000
+ci_level = 0.95
+
+@dataclass(frozen=True)
+class Evaluation:
+    """Metrik (format eval_metrics.json + CI bootstrap) dan residual per baris.
+
+    Dibagi ke semua sesi: jangan ubah `metrics` / `residuals` di tempat.
+    """
+    version: str
+    metrics: dict
+    residuals: pd.DataFrame
+
+    def residual_set(self, name: str) -> pd.DataFrame:
+        """Residual satu set: "hot", atau "train"/"test" jika split tercatat"""
+        return self.residuals[self.residuals["Set"] == name]
+
+def split_mask(n: int, split: dict) -> np.ndarray:
+    """Mask baris test (True) df_latih dari split yang tercatat di meta.json.
+
+    `{"test_indices": [...]}` -> indeks eksplisit; `{"test_size": .., "random_state": ..}`
+    -> sama dengan indeks test sklearn train_test_split pada df_latih.
+    """
+    mask = np.zeros(n, dtype=bool)
+    if "test_indices" in split:
+        mask[np.asarray(split["test_indices"], dtype=np.intp)] = True
+        return mask
+    n_test = int(np.ceil(float(split["test_size"]) * n))
+    perm = np.random.RandomState(int(split["random_state"])).permutation(n)
+    mask[perm[:n_test]] = True
+    return mask
+
+def regression_metrics(y: np.ndarray, pred: np.ndarray) -> dict:
+    """R², RMSE, MAE, MAPE (%) di sumbu terakhir; input (n,) -> skalar, (B, n) -> array (B,)"""
+    err = pred - y
+    ss_res = np.square(err).sum(axis=-1)
+    ss_tot = np.square(y - y.mean(axis=-1, keepdims=True)).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "r2": 1.0 - ss_res / ss_tot,
+            "rmse": np.sqrt(ss_res / y.shape[-1]),
+            "mae": np.abs(err).mean(axis=-1),
+            "mape": (np.abs(err) / np.abs(y)).mean(axis=-1) * 100,
+        }
+
+def bootstrap_ci(y: np.ndarray, pred: np.ndarray, n_boot: int = n_bootstrap,
+                 level: float = ci_level, seed: int = 0) -> dict:
+    """CI persentil semua metrik: satu matriks indeks (n_boot, n), semua resample sekaligus"""
+    idx = np.random.default_rng(seed).integers(0, len(y), size=(n_boot, len(y)))
+    boot = regression_metrics(y[idx], pred[idx])
+    q = [(1 - level) / 2, (1 + level) / 2]
+    return {name: np.nanquantile(values, q).tolist() for name, values in boot.items()}
+
+def _named(metrics: dict, suffix: str) -> dict:
+    # Nama kunci mengikuti eval_metrics.json (r2_test, rmse_hot, ...)
+    return {f"{name}_{suffix}": float(value) for name, value in metrics.items()}
+
+# ==============================
+# 1. Evaluasi per versi model+data
+# ==============================
+def _evaluate_frame(df: pd.DataFrame, pred: np.ndarray, sets: np.ndarray, stored: dict) -> tuple:
+    y = df[target].to_numpy(dtype=np.float64)
+    residuals = pd.DataFrame({
+        "Provinsi": df["Provinsi"].to_numpy(),
+        "Tahun": df["Tahun"].to_numpy(),
+        "Set": sets,
+        "Aktual": y,
+        "Prediksi_IKU": pred,
+        "Residual": y - pred,
+        "Residual_%": (y - pred) / y * 100,
+    })
+
+    live_split = "test" in sets
+    names = ("train", "test", "hot") if live_split else ("hot",)
+    by_set = {name: (y[sets == name], pred[sets == name]) for name in names}
+    hot_test = _named(regression_metrics(*by_set["hot"]), "hot")
+
+    ci = {"level": ci_level, "n_bootstrap": n_bootstrap}
+    for name in names:
+        if name == "train":
+            continue
+        ci.update({f"{k}_{name}": v for k, v in bootstrap_ci(*by_set[name]).items()})
+    if live_split:
+        train_test = {"r2_train": float(regression_metrics(*by_set["train"])["r2"])}
+        train_test.update(_named(regression_metrics(*by_set["test"]), "test"))
+    else:
+        # Split training tidak diketahui: pakai angka dari artefak, tanpa CI
+        train_test = dict(stored.get("train_test", {}))
+    counts = {f"n_{name}": int(len(values[0])) for name, values in by_set.items()}
+    sumber = {"train_test": "split meta.json" if live_split else "artefak metrik", "hot_test": "langsung"}
+    return {"train_test": train_test, "hot_test": hot_test, "ci": ci, "n": counts, "sumber": sumber}, residuals
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+@cache_miss
+def _evaluate_cached(version: str, model_path: str, latih_path: str, hot_path: str,
+                     split_json: str, stored_json: str) -> Evaluation:
+    df_hot = load_csv(hot_path)
+    # Prediksi df_hot dipakai ulang dari hot_results (dibagi dengan tab2 & panel tab3)
+    pred = np.asarray(hot_results(Path(model_path), Path(hot_path)).prediksi)
+    split = json.loads(split_json)
+    if split:
+        df_latih = load_csv(latih_path)
+        df = pd.concat([df_latih, df_hot], ignore_index=True)
+        sets = np.where(split_mask(len(df_latih), split), "test", "train")
+        sets = np.concatenate([sets, np.full(len(df_hot), "hot")])
+        pred = np.concatenate([rf_predict_batch(df_latih, load_compiled_model(model_path)), pred])
+    else:
+        df, sets = df_hot, np.full(len(df_hot), "hot")
+
+    metrics, residuals = _evaluate_frame(df, pred, sets, json.loads(stored_json))
+    metrics["version"] = version
+    metrics["computed"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    result = Evaluation(version=version, metrics=metrics, residuals=residuals)
+    artifact = CACHE_DIR / f"evaluasi.{version}.json"
+    if not artifact.exists():
+        write_metrics(result, artifact)
+    return result
+
+@timed("evaluate", cached=True)
+def evaluate(model=None, latih_path: Path = DF_LATIH_PATH, hot_path: Path = DF_HOT_PATH) -> Evaluation:
+    """Metrik satu versi model (ModelVersion, default: versi aktif), sekali per versi model+data+metadata"""
+    model = active_model() if model is None else model
+    split_json = json.dumps(model.split or {}, sort_keys=True)
+    stored = {} if model.split else {"train_test": model.metrics().get("train_test", {})}
+    stored_json = json.dumps(stored, sort_keys=True)
+
+    h = hashlib.sha256(model_data_version(model.model_path, latih_path, hot_path).encode())
+    h.update(split_json.encode())
+    h.update(stored_json.encode())
+    return _evaluate_cached(h.hexdigest()[:16], str(model.model_path), str(latih_path), str(hot_path),
+                            split_json, stored_json)
+
+def write_metrics(result: Evaluation, path: Path):
+    """Tulis metrik sebagai JSON (format eval_metrics.json), atomik"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(result.metrics, indent=4), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+if __name__ == "__main__":
+    # Hitung ulang & tulis ke file metrik versi aktif:  python -m utils.evaluation --write
+    import argparse
+    parser = argparse.ArgumentParser(description="Evaluasi model aktif terhadap df_latih & df_hot")
+    parser.add_argument("--write", action="store_true", help="tulis ke eval_metrics.json / metrics.json versi aktif")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    result = evaluate()
+    print(json.dumps(result.metrics, indent=2))
+    print(f"Waktu evaluasi: {(time.perf_counter() - t0) * 1e3:.1f} ms")
+    if args.write:
+        model = active_model()
+        write_metrics(result, model.metrics_path)
+        print(f"Ditulis ke {model.metrics_path}")
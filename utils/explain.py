@@ -0,0 +1,47 @@
+# utils/explain.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pathlib import Path
+from utils.helpers import (DF_HOT_PATH, CACHE_DIR, features, load_compiled_model, load_hot,
+                           resolve_model_path)
+from utils.results import model_data_version
+
+# ==============================
+# Kontribusi fitur per provinsi (atribusi jalur pohon)
+# ==============================
+def contributions_frame(df: pd.DataFrame, model=None) -> pd.DataFrame:
+    """Kolom `Bias` + satu kolom kontribusi per fitur; jumlahnya = Prediksi_IKU"""
+    model = load_compiled_model() if model is None else model
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float64))
+    bias, contrib = model.contributions(X)
+    out = pd.DataFrame(contrib, columns=features, index=df.index)
+    out.insert(0, "Bias", bias)
+    out["Prediksi_IKU"] = bias + contrib.sum(axis=1)
+    return out
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _hot_contributions_cached(version: str, model_path: str, hot_path: str) -> pd.DataFrame:
+    # Dihitung sekali per versi model+data; hasilnya dipersist sebagai Parquet
+    parquet_path = CACHE_DIR / f"kontribusi.{version}.parquet"
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path)
+
+    df_hot = load_hot(hot_path)
+    df = pd.concat([df_hot[["Provinsi"]],
+                    contributions_frame(df_hot, load_compiled_model(model_path))], axis=1)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = parquet_path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+    return df
+
+def hot_contributions(model_path: Path = None, hot_path: Path = DF_HOT_PATH) -> pd.DataFrame:
+    """Kontribusi fitur untuk tiap provinsi di df_hot (urutan baris sama dengan df_hot)"""
+    model_path = resolve_model_path(model_path)
+    version = model_data_version(model_path, hot_path)
+    return _hot_contributions_cached(version, str(model_path), str(hot_path))
@@ -0,0 +1,128 @@
+# utils/figures.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import hashlib
+import inspect
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.helpers import CACHE_DIR
+from utils.perf import timed, cache_miss
+
+# ==============================
+# Cache figure Plotly per versi data/model
+# ==============================
+# Figure jadi disimpan di memori (dibagi antar sesi, jangan diubah di tempat) dan
+# JSON-nya dipersist ke disk. st.plotly_chart memvalidasi ulang dict/JSON, jadi
+# yang dikembalikan tetap objek Figure; proses baru cukup parse JSON, tanpa px.
+# Di disk satu folder per nama grafik berisi hanya kunci terbaru: versi lama
+# (data/model, kode builder, argumen) dihapus saat figure baru ditulis.
+FIGURE_CACHE_DIR = CACHE_DIR / "figures"
+
+_source_digests = {}
+
+def _builder_digest(builder) -> str:
+    # Kode builder ikut jadi kunci: ubah kode grafik -> cache otomatis baru
+    code = builder.__code__
+    digest = _source_digests.get(code)
+    if digest is None:
+        try:
+            source = inspect.getsource(builder)
+        except (OSError, TypeError):
+            source = code.co_code.hex()
+        digest = _source_digests[code] = hashlib.sha256(source.encode()).hexdigest()[:12]
+    return digest
+
+def _args_digest(args: tuple) -> str:
+    # Argumen builder ikut jadi kunci (DataFrame/array lewat isinya, lainnya lewat repr)
+    h = hashlib.sha256()
+    for arg in args:
+        if isinstance(arg, (pd.DataFrame, pd.Series)):
+            h.update(repr(list(arg.columns) if isinstance(arg, pd.DataFrame) else arg.name).encode())
+            h.update(pd.util.hash_pandas_object(arg, index=True).to_numpy().tobytes())
+        elif isinstance(arg, np.ndarray):
+            h.update(f"{arg.dtype}{arg.shape}".encode())
+            h.update(np.ascontiguousarray(arg).tobytes())
+        else:
+            h.update(repr(arg).encode())
+        h.update(b"\0")
+    return h.hexdigest()[:12]
+
+@st.cache_resource(show_spinner=False, max_entries=128)
+@cache_miss
+def _figure_cached(name: str, key: str, _builder, _args: tuple):
+    import plotly.io as pio
+
+    slot = FIGURE_CACHE_DIR / name
+    path = slot / f"{key}.json"
+    if path.exists():
+        return pio.from_json(path.read_text(encoding="utf-8"))
+
+    fig = _builder(*_args)
+    slot.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(fig.to_json(), encoding="utf-8")
+    os.replace(tmp_path, path)
+    for old in slot.glob("*.json"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return fig
+
+@timed("cached_figure", cached=True)
+def cached_figure(name: str, version: str, builder, *args):
+    """Figure dari `builder(*args)`, dibangun sekali per (nama, versi, kode builder, args).
+
+    `name` membedakan grafik yang tampil bersamaan (mis. per tahun/k); `version` =
+    versi data/model. Input yang ditangkap closure builder harus tercakup di keduanya.
+    """
+    key = f"{version}.{_builder_digest(builder)}.{_args_digest(args)}"
+    return _figure_cached(name, key, builder, args)
+
+# ==============================
+# Grafik peringkat (satu trace untuk berapa pun jumlah provinsi)
+# ==============================
+ranking_palette = ["#804000", "#A67845", "#C29A6C", "#D9B88C", "#E2CEB1"]   # terbaik -> terburuk
+
+def ranking_colorscale(reverse: bool = False) -> list:
+    """Colorscale Plotly dari `ranking_palette` (posisi 0 = bar pertama)"""
+    stops = ranking_palette[::-1] if reverse else ranking_palette
+    return [[i / (len(stops) - 1), c] for i, c in enumerate(stops)]
+
+def ranking_figure(df, value_col: str = "Prediksi_IKU", label_col: str = "Provinsi",
+                   k: int = None, bottom: bool = False, height: int = None):
+    """Bar horizontal peringkat dalam satu `go.Bar` (marker_color berupa array).
+
+    `k=None` -> semua baris. `bottom=True` -> k terbawah (terburuk di atas),
+    selain itu k teratas (terbaik di atas).
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+
+    ranked = df.sort_values(value_col, ascending=bottom)
+    if k is not None:
+        ranked = ranked.head(k)
+    values = ranked[value_col].to_numpy()
+    labels = ranked[label_col].astype(str).tolist()
+    # Warna numerik + colorscale: divalidasi sebagai satu array, bukan string per bar
+    positions = np.linspace(0.0, 1.0, len(values)) if len(values) > 1 else np.zeros(len(values))
+
+    fig = go.Figure(go.Bar(
+        x=values,
+        y=labels,
+        orientation="h",
+        marker=dict(color=positions, colorscale=ranking_colorscale(reverse=bottom),
+                    cmin=0.0, cmax=1.0, showscale=False),
+        texttemplate="%{x:.2f}",
+        textposition="outside",
+        cliponaxis=False,
+        hovertemplate="%{y}: %{x:.2f}<extra></extra>",
+    ))
+    fig.update_layout(
+        yaxis=dict(categoryorder="array", categoryarray=labels, autorange="reversed"),
+        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", showlegend=False,
+        margin=dict(t=20, l=10, r=40, b=10),
+        height=height or max(400, 24 * len(labels) + 60),
+    )
+    return fig
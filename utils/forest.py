@@ -0,0 +1,254 @@
+# utils/forest.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import json
+import os
+import shutil
+import numpy as np
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# ==============================
+# Forest terkompilasi (array datar, tanpa sklearn saat inferensi)
+# ==============================
+@dataclass(frozen=True)
+class CompiledForest:
+    """Semua node dari semua pohon digabung dalam array datar.
+
+    `left`/`right` berisi indeks node global (-1 untuk daun), `roots` indeks node
+    akar tiap pohon, `value` nilai daun. Perbandingan split memakai X float32,
+    sama seperti sklearn, sehingga hasilnya identik dengan `rf_model.predict`.
+    """
+    feature: np.ndarray      # int32  (n_nodes,)
+    threshold: np.ndarray    # float64 (n_nodes,)
+    left: np.ndarray         # int32  (n_nodes,)
+    right: np.ndarray        # int32  (n_nodes,)
+    value: np.ndarray        # float64 (n_nodes,)
+    roots: np.ndarray        # int32  (n_trees,)
+    max_depth: int
+    feature_names: tuple
+    feature_importances: np.ndarray = None   # float64 (n_features,), dari model sklearn
+    # Array bantu traversal (intp); bisa diberikan langsung dari artefak ter-mmap
+    _children: np.ndarray = field(default=None, repr=False, compare=False)
+    _feature_idx: np.ndarray = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Dibuat sekali per forest jika tidak ikut dimuat (astype tanpa salinan bila sudah intp)
+        if self._children is None:
+            object.__setattr__(self, "_children", np.stack([self.left, self.right]).astype(np.intp))
+        if self._feature_idx is None:
+            object.__setattr__(self, "_feature_idx", self.feature.astype(np.intp, copy=False))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def leaves(self, X, chunk_size: int = 2048) -> np.ndarray:
+        """Indeks daun (n_samples, n_trees) untuk tiap baris & pohon"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"X harus berdimensi (n, {len(self.feature_names)}), didapat {X.shape}")
+        if np.isnan(X).any():
+            raise ValueError("Input X mengandung NaN")
+        if len(X) <= chunk_size:
+            return self._leaves_chunk(X)
+        # Potongan kecil agar array kerja tetap muat di cache CPU
+        return np.vstack([self._leaves_chunk(X[i:i + chunk_size])
+                          for i in range(0, len(X), chunk_size)])
+
+    def _leaves_chunk(self, X: np.ndarray) -> np.ndarray:
+        n, n_features = X.shape
+        children, feature = self._children, self._feature_idx
+        X_flat = X.ravel()
+
+        # Satu "jalur" per (baris, pohon); jalur yang sudah di daun dibuang tiap level
+        node = np.tile(self.roots.astype(np.intp), n)
+        base = np.repeat(np.arange(n, dtype=np.intp) * n_features, self.n_trees)
+        active = np.arange(n * self.n_trees)
+        cur = node.copy()
+        for _ in range(self.max_depth):
+            internal = children[0, cur] >= 0
+            if not internal.all():
+                active, cur, base = active[internal], cur[internal], base[internal]
+                if not len(active):
+                    break
+            go_right = X_flat[base + feature[cur]] > self.threshold[cur]
+            cur = children[go_right.astype(np.intp), cur]
+            node[active] = cur
+        return node.reshape(n, self.n_trees)
+
+    def contributions(self, X, chunk_size: int = 2048) -> tuple:
+        """Atribusi jalur pohon (Saabas) per fitur, dirata-rata atas semua pohon.
+
+        Tiap split menyumbang `value[anak] - value[induk]` ke fitur split-nya, sehingga
+        `bias + contrib.sum(axis=1) == predict(X)`. Return (bias skalar, contrib (n, n_features)).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"X harus berdimensi (n, {len(self.feature_names)}), didapat {X.shape}")
+        if np.isnan(X).any():
+            raise ValueError("Input X mengandung NaN")
+        bias = float(self.value[self.roots].mean())
+        contrib = np.vstack([self._contrib_chunk(X[i:i + chunk_size])
+                             for i in range(0, len(X), chunk_size)]) if len(X) else \
+            np.zeros((0, X.shape[1]))
+        return bias, contrib
+
+    def _contrib_chunk(self, X: np.ndarray) -> np.ndarray:
+        n, n_features = X.shape
+        children, feature, value = self._children, self._feature_idx, self.value
+        X_flat = X.ravel()
+
+        # Traversal sama seperti _leaves_chunk; indeks X (baris*n_features + fitur)
+        # sekaligus menjadi slot akumulasi kontribusi
+        cur = np.tile(self.roots.astype(np.intp), n)
+        base = np.repeat(np.arange(n, dtype=np.intp) * n_features, self.n_trees)
+        contrib = np.zeros(n * n_features)
+        for _ in range(self.max_depth):
+            internal = children[0, cur] >= 0
+            if not internal.all():
+                cur, base = cur[internal], base[internal]
+                if not len(cur):
+                    break
+            slot = base + feature[cur]
+            child = children[(X_flat[slot] > self.threshold[cur]).astype(np.intp), cur]
+            contrib += np.bincount(slot, weights=value[child] - value[cur], minlength=n * n_features)
+            cur = child
+        return contrib.reshape(n, n_features) / self.n_trees
+
+    def predict_trees(self, X) -> np.ndarray:
+        """Prediksi tiap pohon, (n_samples, n_trees)"""
+        return self.value[self.leaves(X)]
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_trees(X).mean(axis=1)
+
+# ==============================
+# 1. Kompilasi dari RandomForestRegressor
+# ==============================
+def compile_forest(model, feature_names=None) -> CompiledForest:
+    """Ratakan `model.estimators_` menjadi satu set array node"""
+    if feature_names is None:
+        feature_names = getattr(model, "feature_names_in_", range(model.n_features_in_))
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in model.estimators_:
+        tree = est.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("Hanya regresi satu output yang didukung")
+        is_leaf = tree.children_left == -1
+        feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(tree.threshold.astype(np.float64))
+        left.append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+        value.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    return CompiledForest(
+        feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold),
+        left=np.concatenate(left),
+        right=np.concatenate(right),
+        value=np.concatenate(value),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=max_depth,
+        feature_names=tuple(str(f) for f in feature_names),
+        feature_importances=np.asarray(model.feature_importances_, dtype=np.float64),
+    )
+
+def verify_compiled(model, forest: CompiledForest, X, rtol: float = 1e-9) -> float:
+    """Bandingkan dengan `model.predict`; error jika tidak ekuivalen. Return selisih maks."""
+    import pandas as pd
+    X = np.asarray(X, dtype=np.float64)
+    expected = model.predict(pd.DataFrame(X, columns=list(forest.feature_names)))
+    actual = forest.predict(X)
+    max_diff = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+    if not np.allclose(expected, actual, rtol=rtol, atol=0):
+        raise AssertionError(f"Forest terkompilasi tidak ekuivalen dengan sklearn (selisih maks {max_diff})")
+    return max_diff
+
+# ==============================
+# 2. Simpan / muat (direktori .npy, bisa di-mmap)
+# ==============================
+# Satu file .npy per array + meta.json. Dengan mmap_mode="r" semua proses (server
+# Streamlit, worker api.py/score.py) berbagi satu salinan di page cache OS.
+_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+_AUX_ARRAYS = ("_children", "_feature_idx")
+_OPTIONAL_ARRAYS = ("feature_importances",)
+FORMAT_VERSION = 1
+
+def save_compiled(forest: CompiledForest, path: Path):
+    """Tulis artefak ke direktori `path` (atomik: tulis ke direktori tmp lalu rename)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    for name in _ARRAYS + _AUX_ARRAYS + _OPTIONAL_ARRAYS:
+        array = getattr(forest, name)
+        if array is not None:
+            np.save(tmp_dir / f"{name.lstrip('_')}.npy", np.ascontiguousarray(array))
+    meta = {"format": FORMAT_VERSION, "max_depth": forest.max_depth,
+            "feature_names": list(forest.feature_names)}
+    (tmp_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    try:
+        os.replace(tmp_dir, path)
+    except OSError:
+        # Proses lain sudah lebih dulu menulis artefak yang sama
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def load_compiled(path: Path, mmap: bool = True) -> CompiledForest:
+    """Muat artefak; `mmap=True` -> array read-only berbasis file (tanpa salinan per proses)"""
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Format artefak forest tidak dikenal: {meta.get('format')}")
+    mode = "r" if mmap else None
+    arrays = {name: np.load(path / f"{name.lstrip('_')}.npy", mmap_mode=mode, allow_pickle=False)
+              for name in _ARRAYS + _AUX_ARRAYS}
+    for name in _OPTIONAL_ARRAYS:
+        if (path / f"{name}.npy").exists():
+            arrays[name] = np.load(path / f"{name}.npy", allow_pickle=False)
+    return CompiledForest(**arrays, max_depth=int(meta["max_depth"]),
+                          feature_names=tuple(meta["feature_names"]))
+
+def nbytes(forest: CompiledForest) -> int:
+    return sum(getattr(forest, name).nbytes for name in _ARRAYS + _AUX_ARRAYS)
+
+if __name__ == "__main__":
+    # Ekspor + verifikasi + ringkasan latensi:  python -m utils.forest
+    import time
+    import pandas as pd
+    from utils.helpers import (CACHE_DIR, features, file_signature, resolve_model_path, load_model,
+                               load_latih, load_hot)
+
+    model_path = resolve_model_path()
+    model = load_model(model_path)
+    forest = compile_forest(model, features)
+    X = pd.concat([load_latih(), load_hot()])[features].to_numpy(dtype=np.float64)
+    max_diff = verify_compiled(model, forest, X)
+    out_path = CACHE_DIR / f"forest.{file_signature(model_path)[2][:16]}"
+    save_compiled(forest, out_path)
+
+    row = X[:1]
+    def per_call_ms(fn, repeat=200):
+        fn()
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - t0) / repeat * 1e3
+
+    row_df = pd.DataFrame(row, columns=features)
+    print(f"Ekspor          : {out_path}")
+    print(f"Pohon / node    : {forest.n_trees} / {len(forest.value)} (kedalaman maks {forest.max_depth})")
+    print(f"Selisih maks    : {max_diff:.3e} (vs rf_model.predict, {len(X)} baris)")
+    print(f"Ukuran array    : {nbytes(forest) / 1024:.1f} KiB (pkl {model_path.stat().st_size / 1024:.1f} KiB)")
+    print(f"1 baris sklearn : {per_call_ms(lambda: model.predict(row_df)):.3f} ms")
+    print(f"1 baris compiled: {per_call_ms(lambda: forest.predict(row)):.3f} ms")
+    print(f"{len(X)} baris sklearn : {per_call_ms(lambda: model.predict(pd.DataFrame(X, columns=features)), 50):.3f} ms")
+    print(f"{len(X)} baris compiled: {per_call_ms(lambda: forest.predict(X), 50):.3f} ms")
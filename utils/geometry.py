@@ -0,0 +1,242 @@
+# utils/geometry.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import gzip
+import hashlib
+import json
+import os
+import numpy as np
+import streamlit as st
+from pathlib import Path
+from utils.helpers import DATA_DIR, GEOJSON_PATH, file_signature, load_geojson
+
+# ==============================
+# Konfigurasi preprocessing geometri
+# ==============================
+GEOMETRY_CACHE_DIR = DATA_DIR / "cache" / "geometry"
+TOPO_OBJECT = "provinces"
+
+# Naikkan jika algoritma encode/simplifikasi berubah
+GEOMETRY_VERSION = "1"
+
+QUANTIZATION = 100_000      # jumlah grid per sumbu (1e5 ≈ 50 m untuk Indonesia)
+PIXEL_TOLERANCE = 1.0       # toleransi Douglas–Peucker dalam piksel layar
+ZOOM_LEVELS = (4, 5, 6, 7)
+
+# ==============================
+# 1. Douglas–Peucker & toleransi per zoom
+# ==============================
+def tolerance_for_zoom(zoom: int, pixel_tolerance: float = PIXEL_TOLERANCE) -> float:
+    """Toleransi simplifikasi (derajat) setara `pixel_tolerance` piksel pada zoom tertentu"""
+    degrees_per_pixel = 360.0 / (256 * 2 ** zoom)
+    return pixel_tolerance * degrees_per_pixel
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplifikasi polyline (titik awal & akhir selalu dipertahankan)"""
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return points
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    pts = points.astype(np.float64)
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = pts[start], pts[end]
+        seg = pts[start + 1:end]
+        d = b - a
+        norm = np.hypot(d[0], d[1])
+        if norm == 0:
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(d[0] * (seg[:, 1] - a[1]) - d[1] * (seg[:, 0] - a[0])) / norm
+        idx = int(np.argmax(dist))
+        if dist[idx] > tolerance:
+            mid = start + 1 + idx
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+
+    simplified = points[keep]
+    # Ring tertutup (pulau tanpa tetangga) minimal 4 titik agar tetap poligon
+    if np.array_equal(points[0], points[-1]) and len(simplified) < 4 and n >= 4:
+        simplified = points[[0, n // 3, 2 * n // 3, n - 1]]
+    return simplified
+
+# ==============================
+# 2. Kuantisasi koordinat
+# ==============================
+def _polygons_of(geometry: dict) -> list:
+    if geometry is None:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    raise ValueError(f"Tipe geometri tidak didukung: {geometry['type']}")
+
+def _quantize_ring(ring, x0: float, y0: float, kx: float, ky: float) -> np.ndarray:
+    coords = np.asarray(ring, dtype=np.float64)[:, :2]
+    q = np.empty(coords.shape, dtype=np.int64)
+    q[:, 0] = np.round((coords[:, 0] - x0) / kx)
+    q[:, 1] = np.round((coords[:, 1] - y0) / ky)
+    # Buang titik berurutan yang jatuh ke sel grid yang sama
+    dup = np.zeros(len(q), dtype=bool)
+    dup[1:] = np.all(q[1:] == q[:-1], axis=1)
+    q = q[~dup]
+    if not np.array_equal(q[0], q[-1]):
+        q = np.vstack([q, q[:1]])
+    return q
+
+# ==============================
+# 3. Topologi: potong ring di titik junction & bagi arc
+# ==============================
+def _find_junctions(rings: list) -> set:
+    """Titik yang tetangganya berbeda antar ring = batas awal/akhir arc bersama"""
+    seen = {}
+    junctions = set()
+    for ring in rings:
+        pts = [tuple(p) for p in ring[:-1].tolist()]
+        m = len(pts)
+        for i, p in enumerate(pts):
+            prev, nxt = pts[i - 1], pts[(i + 1) % m]
+            pair = (prev, nxt) if prev < nxt else (nxt, prev)
+            old = seen.get(p)
+            if old is None:
+                seen[p] = pair
+            elif old != pair:
+                junctions.add(p)
+    return junctions
+
+def _cut_ring(ring: np.ndarray, junctions: set) -> list:
+    pts = ring[:-1]
+    idx = [i for i, p in enumerate(map(tuple, pts.tolist())) if p in junctions]
+    if not idx:
+        return [ring]
+    rotated = np.vstack([pts[idx[0]:], pts[:idx[0]], pts[idx[0]:idx[0] + 1]])
+    cuts = [i - idx[0] for i in idx] + [len(pts)]
+    return [rotated[a:b + 1] for a, b in zip(cuts[:-1], cuts[1:])]
+
+# ==============================
+# 4. Encode TopoJSON
+# ==============================
+def geojson_to_topojson(geojson: dict, zoom: int = None,
+                        quantization: int = QUANTIZATION,
+                        pixel_tolerance: float = PIXEL_TOLERANCE) -> dict:
+    """GeoJSON → TopoJSON terkuantisasi dengan arc bersama; `zoom` mengaktifkan simplifikasi"""
+    all_coords = np.vstack([
+        np.asarray(ring, dtype=np.float64)[:, :2]
+        for f in geojson["features"] for poly in _polygons_of(f["geometry"]) for ring in poly
+    ])
+    x0, y0 = all_coords.min(axis=0)
+    x1, y1 = all_coords.max(axis=0)
+    kx = (x1 - x0) / (quantization - 1) or 1.0
+    ky = (y1 - y0) / (quantization - 1) or 1.0
+
+    # Kuantisasi semua ring; ring yang kolaps (< 4 titik) dibuang
+    quantized = []
+    for f in geojson["features"]:
+        polys = []
+        for poly in _polygons_of(f["geometry"]):
+            rings = [_quantize_ring(r, x0, y0, kx, ky) for r in poly]
+            if len(rings[0]) < 4:
+                continue
+            polys.append([r for r in rings if len(r) >= 4])
+        quantized.append(polys)
+
+    junctions = _find_junctions([r for polys in quantized for poly in polys for r in poly])
+    tolerance = 0.0 if zoom is None else tolerance_for_zoom(zoom, pixel_tolerance) / max(kx, ky)
+
+    arcs, arc_index = [], {}
+
+    def arc_id(arc: np.ndarray) -> int:
+        key = arc.tobytes()
+        if key in arc_index:
+            return arc_index[key]
+        rev_key = arc[::-1].copy().tobytes()
+        if rev_key in arc_index:
+            return ~arc_index[rev_key]
+        arc_index[key] = len(arcs)
+        arcs.append(douglas_peucker(arc, tolerance))
+        return arc_index[key]
+
+    geometries = []
+    for f, polys in zip(geojson["features"], quantized):
+        arcs_geom = [[[arc_id(a) for a in _cut_ring(ring, junctions)] for ring in poly] for poly in polys]
+        geometries.append({
+            "type": "MultiPolygon",
+            "arcs": arcs_geom,
+            "properties": dict(f.get("properties") or {}),
+        })
+
+    # Delta encoding: titik pertama absolut, berikutnya selisih
+    encoded_arcs = []
+    for arc in arcs:
+        delta = np.vstack([arc[:1], np.diff(arc, axis=0)])
+        encoded_arcs.append(delta.tolist())
+
+    return {
+        "type": "Topology",
+        "transform": {"scale": [kx, ky], "translate": [float(x0), float(y0)]},
+        "objects": {TOPO_OBJECT: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": encoded_arcs,
+    }
+
+def dumps_compact(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+# ==============================
+# 5. Cache artefak TopoJSON per zoom
+# ==============================
+def topojson_key(zoom: int = None, path: Path = GEOJSON_PATH) -> str:
+    h = hashlib.sha256()
+    h.update(GEOMETRY_VERSION.encode())
+    h.update(file_signature(path)[2].encode())
+    h.update(f"{zoom}|{QUANTIZATION}|{PIXEL_TOLERANCE}".encode())
+    return h.hexdigest()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _load_topojson_cached(key: str, zoom, path: str) -> dict:
+    cache_path = GEOMETRY_CACHE_DIR / f"{key}.topojson"
+    if cache_path.exists():
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    topology = geojson_to_topojson(load_geojson(path), zoom=zoom)
+    GEOMETRY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(dumps_compact(topology), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
+    return topology
+
+def load_topojson(zoom: int = None, path: Path = GEOJSON_PATH) -> dict:
+    """TopoJSON provinsi (disimplifikasi untuk `zoom`), dibangun sekali per isi file"""
+    return _load_topojson_cached(topojson_key(zoom, path), zoom, str(path))
+
+# ==============================
+# 6. Laporan ukuran payload
+# ==============================
+def payload_report(path: Path = GEOJSON_PATH, zoom_levels=ZOOM_LEVELS) -> list:
+    """Ukuran payload (raw & gzip) GeoJSON asli vs TopoJSON per zoom"""
+    def sizes(name: str, text: str) -> dict:
+        raw = text.encode("utf-8")
+        return {"artefak": name, "bytes": len(raw), "gzip_bytes": len(gzip.compress(raw))}
+
+    rows = [sizes("geojson (file asli)", Path(path).read_text(encoding="utf-8"))]
+    geojson = load_geojson(path)
+    rows.append(sizes("geojson (compact)", dumps_compact(geojson)))
+    rows.append(sizes("topojson (tanpa simplifikasi)", dumps_compact(geojson_to_topojson(geojson))))
+    for zoom in zoom_levels:
+        rows.append(sizes(f"topojson zoom {zoom}", dumps_compact(geojson_to_topojson(geojson, zoom=zoom))))
+    return rows
+
+if __name__ == "__main__":
+    report = payload_report()
+    base = report[0]["bytes"]
+    print(f"{'Artefak':<32}{'Bytes':>12}{'Gzip':>12}{'Rasio':>8}")
+    for row in report:
+        print(f"{row['artefak']:<32}{row['bytes']:>12,}{row['gzip_bytes']:>12,}{row['bytes'] / base:>8.1%}")
@@ -4,9 +4,14 @@
 
 import pandas as pd
 import numpy as np
-import joblib
 import json
+import hashlib
+import os
+import re
+import streamlit as st
 from pathlib import Path
+from utils.forest import CompiledForest, compile_forest, verify_compiled, save_compiled, load_compiled
+from utils.perf import timed, cache_miss
 
 # ==============================
 # Base path supaya path fleksibel
@@ -17,50 +22,197 @@ MODEL_PATH = DATA_DIR / "rf_augmentasi.pkl"
 DF_LATIH_PATH = DATA_DIR / "df_latih.csv"
 DF_HOT_PATH = DATA_DIR / "df_hot.csv"
 GEOJSON_PATH = DATA_DIR / "provinces_idn.geojson"   
+METRICS_PATH = DATA_DIR / "eval_metrics.json"
+
+CACHE_DIR = DATA_DIR / "cache"
+
+numeric_cols = ["IKTL_(%)","Karhutla_(ha)","Kendaraan_Bermotor",
+                "Rumah_Tangga_Listrik_PLN_(%)","Indeks_Kualitas_Udara_(%)"]
+
+# Skema CSV (nama kolom sudah dibersihkan) -> dtype
+csv_schema = {
+    "Provinsi": "string",
+    "Tahun": "int64",
+    **{col: "float64" for col in numeric_cols},
+}
+
+# ==============================
+# 0. Registry artefak (cache lintas sesi)
+# ==============================
+_digest_cache = {}
+
+def file_signature(path: Path) -> tuple:
+    """Kunci cache artefak: (path, mtime, sha256 isi file)"""
+    path = Path(path)
+    stat = path.stat()
+    stat_key = (str(path), stat.st_mtime_ns, stat.st_size)
+    digest = _digest_cache.get(stat_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _digest_cache[stat_key] = digest
+    return str(path), stat.st_mtime_ns, digest
+
+def clean_name(name: str) -> str:
+    """Bersihkan satu nama kolom: hapus spasi dan karakter aneh"""
+    return re.sub(r'\s+', '_', name.strip().replace('\ufeff', ''))
+
+def read_csv_id(path, schema: dict = None, chunksize: int = None):
+    """Baca CSV berformat angka Indonesia ('1.284,70') dalam satu kali parse.
+
+    Hanya kolom di `schema` yang dibaca, dengan dtype eksplisit. Jika `chunksize`
+    diisi, hasilnya iterator DataFrame per potongan.
+    """
+    schema = csv_schema if schema is None else schema
+    header = pd.read_csv(path, nrows=0).columns
+    if hasattr(path, "seek"):
+        path.seek(0)
+    raw_to_clean = {raw: clean_name(raw) for raw in header if clean_name(raw) in schema}
+
+    reader = pd.read_csv(
+        path,
+        usecols=list(raw_to_clean),
+        dtype={raw: schema[clean] for raw, clean in raw_to_clean.items()},
+        decimal=",",
+        thousands=".",
+        chunksize=chunksize,
+    )
+    if chunksize is None:
+        return reader.rename(columns=raw_to_clean)
+    return (chunk.rename(columns=raw_to_clean) for chunk in reader)
+
+# Versi lama dilepas dari memori setelah beberapa kali ganti model (registry)
+@st.cache_resource(show_spinner=False, max_entries=2)
+@cache_miss
+def _load_model_cached(path: str, mtime_ns: int, digest: str):
+    import joblib   # import berat, hanya saat model benar-benar dibutuhkan
+    return joblib.load(path)
+
+@st.cache_data(show_spinner=False)
+@cache_miss
+def _load_csv_cached(path: str, mtime_ns: int, digest: str) -> pd.DataFrame:
+    # Parse CSV sekali per isi file; hasil bertipe disimpan sebagai Parquet
+    parquet_path = CACHE_DIR / f"{Path(path).stem}.{digest[:16]}.parquet"
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path)
+
+    df = read_csv_id(path)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = parquet_path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+    return df
+
+@st.cache_data(show_spinner=False)
+@cache_miss
+def _load_json_cached(path: str, mtime_ns: int, digest: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 # ==============================
 # 1. Load Model RF Augmentasi
 # ==============================
-rf_model = joblib.load(MODEL_PATH)
+def resolve_model_path(path: Path = None) -> Path:
+    """Path model eksplisit, atau model versi aktif di registry (lihat utils.registry)"""
+    if path is not None:
+        return Path(path)
+    from utils.registry import active_model_path
+    return active_model_path()
+
+@timed("load_model", cached=True)
+def load_model(path: Path = None):
+    """Model RF, dimuat ulang hanya jika file .pkl berubah"""
+    return _load_model_cached(*file_signature(resolve_model_path(path)))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+@cache_miss
+def _load_compiled_cached(path: str, mtime_ns: int, digest: str) -> CompiledForest:
+    forest_dir = CACHE_DIR / f"forest.{digest[:16]}"
+    if (forest_dir / "meta.json").exists():
+        return load_compiled(forest_dir)   # mmap: dibagi antar proses lewat page cache
+
+    # Kompilasi sekali per isi .pkl, cek ekuivalensi dengan sklearn, lalu simpan.
+    # Model sklearn sengaja tidak lewat cache: setelah artefak ditulis, forest sklearn
+    # dan salinan array privatnya dilepas, yang tersisa hanya artefak mmap.
+    import joblib
+    model = joblib.load(path)
+    forest = compile_forest(model, features)
+    X_check = pd.concat([load_latih(), load_hot()])[features].to_numpy(dtype=np.float64)
+    verify_compiled(model, forest, X_check)
+    save_compiled(forest, forest_dir)
+    del model, forest
+    return load_compiled(forest_dir)
+
+@timed("load_compiled_model", cached=True)
+def load_compiled_model(path: Path = None) -> CompiledForest:
+    """Forest dalam bentuk array datar untuk inferensi cepat (lihat utils.forest)"""
+    return _load_compiled_cached(*file_signature(resolve_model_path(path)))
 
 # ==============================
 # 2. Load CSV
 # ==============================
-df_latih = pd.read_csv(DF_LATIH_PATH)
-df_hot = pd.read_csv(DF_HOT_PATH)
+@timed("load_latih", cached=True)
+def load_latih(path: Path = DF_LATIH_PATH) -> pd.DataFrame:
+    """Data latih yang sudah dibersihkan (salinan per pemanggil)"""
+    return _load_csv_cached(*file_signature(path))
 
-def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
-    """Bersihkan nama kolom: hapus spasi dan karakter aneh"""
-    df.columns = df.columns.str.strip().str.replace('\ufeff','', regex=False)\
-                            .str.replace(r'\s+', '_', regex=True)
-    return df
+@timed("load_hot", cached=True)
+def load_hot(path: Path = DF_HOT_PATH) -> pd.DataFrame:
+    """Data hot test 2022 yang sudah dibersihkan (salinan per pemanggil)"""
+    return _load_csv_cached(*file_signature(path))
+
+@timed("load_csv", cached=True)
+def load_csv(path: Path) -> pd.DataFrame:
+    """Sembarang CSV berformat sama dengan df_latih/df_hot (mis. data tahun baru)"""
+    return _load_csv_cached(*file_signature(path))
 
-df_latih = clean_column_names(df_latih)
-df_hot = clean_column_names(df_hot)
 
 # ==============================
-# 3. Load GeoJSON Provinsi
+# 3. Load GeoJSON Provinsi & Metrik
 # ==============================
+@timed("load_geojson", cached=True)
 def load_geojson(path: Path = GEOJSON_PATH):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _load_json_cached(*file_signature(path))
+
+@timed("load_json", cached=True)
+def load_json(path: Path):
+    return _load_json_cached(*file_signature(path))
+
+@timed("load_metrics", cached=True)
+def load_metrics(path: Path = None) -> dict:
+    """Metrik evaluasi; default milik versi model aktif"""
+    if path is None:
+        from utils.registry import active_model
+        path = active_model().metrics_path
+    return _load_json_cached(*file_signature(path))
 
-geojson_prov = load_geojson()
 
 # ==============================
 # 4. Klasifikasi IKU
 # ==============================
+# Satu-satunya sumber batas kategori IKU (batas bawah, inklusif)
+iku_bins = [25, 50, 70, 90]
+iku_labels = ["Sangat Kurang", "Kurang", "Sedang", "Baik", "Sangat Baik"]   # urutan naik
+
 def iku_category(value: float) -> str:
-    if value >= 90:
-        return "Sangat Baik"
-    elif value >= 70:
-        return "Baik"
-    elif value >= 50:
-        return "Sedang"
-    elif value >= 25:
-        return "Kurang"
-    else:
-        return "Sangat Kurang"
+    """Kategori satu nilai IKU; NaN/inf -> NaN (kategori kosong), sama dengan iku_categories"""
+    return iku_categories([value])[0]
+
+def iku_categories(values) -> pd.Categorical:
+    """Kategori IKU per nilai: Categorical terurut (NaN/inf -> kategori kosong)"""
+    v = np.asarray(values, dtype=np.float64)
+    codes = np.digitize(v, iku_bins)
+    codes[~np.isfinite(v)] = -1
+    return pd.Categorical.from_codes(codes, categories=iku_labels, ordered=True)
+
+def iku_ranges() -> list:
+    """(kategori, batas bawah, batas atas) dari terbaik ke terburuk, untuk tabel"""
+    lows = [0] + iku_bins
+    highs = iku_bins + [100]
+    return [(label, lo, hi) for label, lo, hi in zip(iku_labels, lows, highs)][::-1]
 
 color_map_category = {
     "Sangat Baik": "darkgreen",
@@ -70,38 +222,88 @@ color_map_category = {
     "Sangat Kurang": "red"
 }
 
+# Palet coklat untuk kotak hasil demo prediksi (tab2)
+color_map_demo = {
+    "Sangat Baik": "#4E342E",
+    "Baik": "#6D4C41",
+    "Sedang": "#A1887F",
+    "Kurang": "#D7CCC8",
+    "Sangat Kurang": "#E2CEB1"
+}
+
+def iku_colors(values, color_map: dict = color_map_category, nan_color: str = "gray") -> np.ndarray:
+    """Array warna sejajar `values` sesuai kategori IKU"""
+    palette = np.array([color_map[label] for label in iku_labels] + [nan_color], dtype=object)
+    return palette[iku_categories(values).codes]
+
 # ==============================
 # 5. Prediksi RF Augmentasi
 # ==============================
-def rf_predict(row: pd.Series) -> float:
-    """Prediksi IKU menggunakan RF augmentasi"""
-    row_df = row.to_frame().T
-    return rf_model.predict(row_df)[0]
+@timed("rf_predict_batch")
+def rf_predict_batch(df: pd.DataFrame, model=None) -> np.ndarray:
+    """Prediksi IKU banyak baris sekaligus (satu kali panggil predict)"""
+    missing = [col for col in features if col not in df.columns]
+    if missing:
+        raise KeyError(f"Kolom fitur tidak ditemukan: {missing}")
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float64))
+    return _predict_matrix(X, model)
+
+@timed("rf_predict")
+def rf_predict(row: pd.Series, model=None) -> float:
+    """Prediksi IKU satu baris: pembungkus tipis rf_predict_batch (validasi & urutan fitur sama)"""
+    return float(rf_predict_batch(row.to_frame().T, model)[0])
+
+def _predict_matrix(X: np.ndarray, model=None) -> np.ndarray:
+    # Default: forest terkompilasi; model sklearn tetap didukung
+    model = load_compiled_model() if model is None else model
+    if isinstance(model, CompiledForest):
+        return model.predict(X)
+    return model.predict(pd.DataFrame(X, columns=features))
+
+# Interval prediksi dari sebaran prediksi antar pohon
+interval_level = 0.90
+
+@timed("rf_predict_interval_batch")
+def rf_predict_interval_batch(df: pd.DataFrame, model=None, level: float = interval_level) -> dict:
+    """Prediksi + sebaran antar pohon untuk banyak baris dalam satu pass.
+
+    Return dict array: `prediksi` (rata-rata pohon, sama dengan rf_predict_batch),
+    `std`, `bawah` dan `atas` (kuantil (1-level)/2 dan (1+level)/2 antar pohon).
+    """
+    missing = [col for col in features if col not in df.columns]
+    if missing:
+        raise KeyError(f"Kolom fitur tidak ditemukan: {missing}")
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float64))
+    return _interval_matrix(X, model, level)
+
+def _interval_matrix(X: np.ndarray, model=None, level: float = interval_level) -> dict:
+    model = load_compiled_model() if model is None else model
+    if not isinstance(model, CompiledForest):
+        model = compile_forest(model, features)
+    trees = model.predict_trees(X)          # (n_samples, n_trees)
+    bawah, atas = np.quantile(trees, [(1 - level) / 2, (1 + level) / 2], axis=1)
+    return {
+        "prediksi": trees.mean(axis=1),
+        "std": trees.std(axis=1),
+        "bawah": bawah,
+        "atas": atas,
+    }
+
+@timed("rf_predict_interval")
+def rf_predict_interval(row: pd.Series, level: float = interval_level, model=None) -> dict:
+    """Seperti rf_predict, plus std & batas interval (skalar)"""
+    X = np.array([[row[col] for col in features]], dtype=np.float64)
+    return {key: float(val[0]) for key, val in _interval_matrix(X, model, level).items()}
 
 # ==============================
 # 6. Load CSV modular
 # ==============================
 def load_predictions(path: Path = DF_HOT_PATH) -> pd.DataFrame:
-    return pd.read_csv(path)
-
-# ==============================
-# 7. Bersihkan kolom numerik
-# ==============================
-numeric_cols = ["IKTL_(%)","Karhutla_(ha)","Kendaraan_Bermotor",
-                "Rumah_Tangga_Listrik_PLN_(%)","Indeks_Kualitas_Udara_(%)"]
-
-for col in numeric_cols:
-    df_latih[col] = pd.to_numeric(
-        df_latih[col].astype(str).str.replace('.', '', regex=False)
-                            .str.replace(',', '.', regex=False)
-    )
-    df_hot[col] = pd.to_numeric(
-        df_hot[col].astype(str).str.replace('.', '', regex=False)
-                           .str.replace(',', '.', regex=False)
-    )
+    """CSV prediksi/hot test lewat parser yang sama (read_csv_id + cache per isi file)"""
+    return load_csv(path)
 
 # ==============================
-# 8. Fitur untuk prediksi
+# 7. Fitur untuk prediksi
 # ==============================
 features = ["IKTL_(%)", "Karhutla_(ha)", "Kendaraan_Bermotor", "Rumah_Tangga_Listrik_PLN_(%)"]
 
@@ -111,3 +313,34 @@ features_fullname = {
     "Kendaraan_Bermotor": "Jumlah Kendaraan Bermotor",
     "Rumah_Tangga_Listrik_PLN_(%)": "Persentase Rumah Tangga Memiliki Listrik PLN"
 }
+
+# Range data latih per fitur (batas peringatan ekstrapolasi); default untuk model
+# di luar registry, versi terdaftar menyimpan range-nya sendiri di meta.json
+input_ranges = {
+    "IKTL_(%)": (0.00, 100.00),
+    "Karhutla_(ha)": (0.00, 336798.00),
+    "Kendaraan_Bermotor": (142862, 22774562),
+    "Rumah_Tangga_Listrik_PLN_(%)": (43.14, 100.00)
+}
+
+def active_input_ranges() -> dict:
+    """Range data latih milik versi model aktif (cek per baris: utils.drift.out_of_range)"""
+    from utils.registry import active_model
+    return active_model().input_ranges
+
+# ==============================
+# 8. Akses malas untuk nama lama (rf_model, df_latih, df_hot, geojson_prov)
+# ==============================
+# Tidak ada artefak yang dimuat saat modul di-import; nama-nama ini tetap bisa
+# di-import dan akan memanggil loader (ber-cache) saat pertama kali diakses.
+_lazy_artifacts = {
+    "rf_model": load_model,
+    "df_latih": load_latih,
+    "df_hot": load_hot,
+    "geojson_prov": load_geojson,
+}
+
+def __getattr__(name: str):
+    if name in _lazy_artifacts:
+        return _lazy_artifacts[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,94 @@
+# utils/panel.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from dataclasses import dataclass, field
+from pathlib import Path
+from utils.helpers import (DATA_DIR, DF_LATIH_PATH, DF_HOT_PATH, CACHE_DIR, file_signature,
+                           load_csv, load_compiled_model, resolve_model_path, rf_predict_batch, iku_categories)
+from utils.perf import timed, cache_miss
+from utils.provinsi import add_kode_provinsi
+from utils.results import hot_results
+
+# ==============================
+# Panel provinsi x tahun (multi-tahun, ingest inkremental)
+# ==============================
+# File tahun baru cukup diletakkan di data/tahun/ (format sama dengan df_hot.csv)
+YEAR_DIR = DATA_DIR / "tahun"
+PANEL_CACHE_DIR = CACHE_DIR / "panel"
+
+@dataclass(frozen=True)
+class Panel:
+    """Semua tahun dalam satu frame, urut per Tahun (urutan provinsi sesuai file), + slice per tahun.
+
+    Dibagi ke semua sesi: DataFrame-nya privat, `frame()` dan `tahun()` memberi salinan.
+    """
+    version: str
+    _frame: pd.DataFrame = field(repr=False, compare=False)
+    years: tuple = ()
+    _slices: dict = field(default=None, repr=False, compare=False)
+
+    def frame(self) -> pd.DataFrame:
+        """Salinan semua tahun + prediksi"""
+        return self._frame.copy()
+
+    def tahun(self, year: int) -> pd.DataFrame:
+        """Salinan data + prediksi satu tahun (slice posisi, tanpa filter ulang)"""
+        return self._frame.iloc[self._slices[year]].copy()
+
+def panel_sources() -> list:
+    """File sumber panel; urutan menentukan prioritas (file belakangan menimpa tahun yang sama)"""
+    sources = [DF_LATIH_PATH, DF_HOT_PATH]
+    if YEAR_DIR.exists():
+        sources += sorted(YEAR_DIR.glob("*.csv"))
+    return sources
+
+def _score_source(path: str, digest: str, model_path: str, model_digest: str) -> pd.DataFrame:
+    # Satu file sumber dibaca & diprediksi sekali per (isi file, versi model)
+    scored_path = PANEL_CACHE_DIR / f"{Path(path).stem}.{digest[:16]}.{model_digest[:16]}.parquet"
+    if scored_path.exists():
+        return pd.read_parquet(scored_path)
+
+    if Path(path) == DF_HOT_PATH:
+        # df_hot sudah diskor (dengan kode provinsi & kategori) oleh hot_results: pakai ulang
+        df = hot_results(Path(model_path), Path(path)).frame()
+        df = df.drop(columns=["Prediksi_Std", "Prediksi_Bawah", "Prediksi_Atas"])
+    else:
+        df = add_kode_provinsi(load_csv(path))
+        df["Prediksi_IKU"] = rf_predict_batch(df, load_compiled_model(model_path))
+        df["Kategori"] = iku_categories(df["Prediksi_IKU"])
+    PANEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = scored_path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, scored_path)
+    return df
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+@cache_miss
+def _panel_cached(version: str, sources: tuple, model_path: str, model_digest: str) -> Panel:
+    frames = [_score_source(path, digest, model_path, model_digest) for path, digest in sources]
+    df = pd.concat(frames, ignore_index=True)
+    df = df.drop_duplicates(subset=["Tahun", "Provinsi"], keep="last")
+    df = df.sort_values("Tahun", kind="stable").reset_index(drop=True)
+
+    tahun = df["Tahun"].to_numpy()
+    years, starts = np.unique(tahun, return_index=True)
+    stops = np.append(starts[1:], len(df))
+    slices = {int(y): slice(int(a), int(b)) for y, a, b in zip(years, starts, stops)}
+    return Panel(version=version, _frame=df, years=tuple(slices), _slices=slices)
+
+@timed("load_panel", cached=True)
+def load_panel(model_path: Path = None) -> Panel:
+    """Panel semua tahun + prediksi; hanya file baru/berubah yang diproses ulang"""
+    model_path = resolve_model_path(model_path)
+    sources = tuple((path, digest) for path, _, digest in map(file_signature, panel_sources()))
+    model_digest = file_signature(model_path)[2]
+    h = hashlib.sha256(model_digest.encode())
+    for path, digest in sources:
+        h.update(f"{path}:{digest}".encode())
+    return _panel_cached(h.hexdigest()[:16], sources, str(model_path), model_digest)
@@ -0,0 +1,214 @@
+# utils/perf.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# ==============================
+# Instrumentasi jalur panas (aktif hanya jika AIROLYTICS_PROFILE=1)
+# ==============================
+# Saat flag mati, `timed`/`cache_miss` mengembalikan fungsi asli apa adanya dan
+# `timer`/`stopwatch` mengembalikan objek no-op bersama, jadi biayanya ~nol.
+ENABLED = os.environ.get("AIROLYTICS_PROFILE", "").lower() in ("1", "true", "yes")
+TRACE_ALLOC = ENABLED and os.environ.get("AIROLYTICS_PROFILE_ALLOC", "1").lower() not in ("0", "false", "no")
+
+logger = logging.getLogger("airolytics.perf")
+if ENABLED and not logger.handlers:
+    # Tanpa handler, INFO dibuang oleh handler last-resort logging: log terstruktur
+    # (satu baris JSON per rerun) dikirim ke stderr
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_local = threading.local()          # rekaman per rerun (tiap sesi Streamlit = thread sendiri)
+_totals = {}                        # agregat proses: nama -> [calls, seconds, misses]
+_totals_lock = threading.Lock()
+
+class _Record:
+    __slots__ = ("name", "depth", "start", "seconds", "alloc_kb", "cache")
+
+    def __init__(self, name: str):
+        self.name, self.depth = name, 0
+        self.start, self.seconds, self.alloc_kb, self.cache = 0.0, 0.0, None, None
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "depth": self.depth, "ms": round(self.seconds * 1e3, 3),
+                "alloc_kb": self.alloc_kb, "cache": self.cache}
+
+class _Timer:
+    __slots__ = ("record", "mem0")
+
+    def __init__(self, name: str):
+        self.record = _Record(name)
+
+    def __enter__(self):
+        stack = _stack()
+        self.record.depth = len(stack)
+        stack.append(self.record)
+        self.mem0 = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.record.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        record = self.record
+        record.seconds = time.perf_counter() - record.start
+        if self.mem0 is not None:
+            record.alloc_kb = round((tracemalloc.get_traced_memory()[0] - self.mem0) / 1024, 1)
+        stack = _stack()
+        if stack and stack[-1] is record:
+            stack.pop()
+        records = getattr(_local, "records", None)
+        if records is not None:
+            records.append(record)
+        with _totals_lock:
+            total = _totals.setdefault(record.name, [0, 0.0, 0])
+            total[0] += 1
+            total[1] += record.seconds
+            total[2] += record.cache == "miss"
+        return False
+
+def _stack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+# ==============================
+# 1. API instrumentasi
+# ==============================
+_NULL = nullcontext()
+
+def timer(name: str):
+    """Context manager: `with timer("tab3.peta"): ...`"""
+    return _Timer(name) if ENABLED else _NULL
+
+def timed(name: str = None, cached: bool = False):
+    """Decorator timer; `cached=True` menandai hit/miss (lihat `cache_miss`)"""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(label) as record:
+                if cached:
+                    record.cache = "hit"
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def cache_miss(fn):
+    """Pasang di bawah @st.cache_*: badan fungsi hanya jalan saat miss"""
+    if not ENABLED:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        stack = _stack()
+        if stack and stack[-1].cache is not None:
+            stack[-1].cache = "miss"
+        return fn(*args, **kwargs)
+    return wrapper
+
+class _Stopwatch:
+    """Bagian berurutan dalam satu halaman: `sw.lap("peta")` menutup bagian sebelumnya"""
+
+    def __init__(self, prefix: str):
+        self.prefix, self.current = prefix, None
+
+    def lap(self, name: str):
+        self.stop()
+        self.current = _Timer(f"{self.prefix}.{name}")
+        self.current.__enter__()
+
+    def stop(self):
+        if self.current is not None:
+            self.current.__exit__(None, None, None)
+            self.current = None
+
+class _NullStopwatch:
+    def lap(self, name: str):
+        pass
+
+    def stop(self):
+        pass
+
+_NULL_STOPWATCH = _NullStopwatch()
+
+def stopwatch(prefix: str):
+    return _Stopwatch(prefix) if ENABLED else _NULL_STOPWATCH
+
+# ==============================
+# 2. Siklus per rerun & ekspor
+# ==============================
+def start_run():
+    """Mulai rekaman baru untuk rerun ini (dipanggil di awal app.py)"""
+    if not ENABLED:
+        return
+    if TRACE_ALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _local.records = []
+    _local.stack = []
+    _local.t0 = time.perf_counter()
+
+def end_run() -> list:
+    """Selesaikan rekaman rerun; log satu baris JSON terstruktur dan return rekamannya"""
+    records = getattr(_local, "records", None)
+    if not ENABLED or records is None:
+        return []
+    rows = [r.as_dict() for r in sorted(records, key=lambda r: r.start)]
+    total_ms = round((time.perf_counter() - _local.t0) * 1e3, 3)
+    logger.info(json.dumps({"event": "rerun", "total_ms": total_ms, "sections": rows}))
+    _local.records = None
+    return rows
+
+def prometheus_text() -> str:
+    """Agregat proses dalam format eksposisi teks Prometheus"""
+    with _totals_lock:
+        totals = {name: list(v) for name, v in _totals.items()}
+    lines = [
+        "# HELP airolytics_section_calls_total Jumlah eksekusi bagian terinstrumentasi",
+        "# TYPE airolytics_section_calls_total counter",
+    ]
+    lines += [f'airolytics_section_calls_total{{section="{n}"}} {v[0]}' for n, v in sorted(totals.items())]
+    lines += [
+        "# HELP airolytics_section_seconds_total Total waktu per bagian (detik)",
+        "# TYPE airolytics_section_seconds_total counter",
+    ]
+    lines += [f'airolytics_section_seconds_total{{section="{n}"}} {v[1]:.6f}' for n, v in sorted(totals.items())]
+    lines += [
+        "# HELP airolytics_cache_misses_total Jumlah cache miss per loader",
+        "# TYPE airolytics_cache_misses_total counter",
+    ]
+    lines += [f'airolytics_cache_misses_total{{section="{n}"}} {v[2]}' for n, v in sorted(totals.items())]
+    return "\n".join(lines) + "\n"
+
+def show_panel():
+    """Panel timing developer di sidebar (hanya saat profiling aktif)"""
+    if not ENABLED:
+        return
+    import pandas as pd
+    import streamlit as st
+
+    rows = end_run()
+    with st.sidebar.expander("⏱️ Profiling (dev)", expanded=False):
+        if not rows:
+            st.caption("Belum ada rekaman untuk rerun ini.")
+            return
+        df = pd.DataFrame(rows)
+        df["name"] = ["· " * d + n for d, n in zip(df["depth"], df["name"])]
+        top_level_ms = df.loc[df["depth"] == 0, "ms"].sum()
+        st.caption(f"Total bagian level atas: {top_level_ms:.1f} ms")
+        st.dataframe(df.drop(columns="depth"), hide_index=True, use_container_width=True)
+        st.download_button("Unduh metrik (Prometheus)", prometheus_text(),
+                           file_name="airolytics_metrics.txt", mime="text/plain")
@@ -0,0 +1,147 @@
+# utils/provinsi.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import json
+import os
+import re
+import threading
+import warnings
+import pandas as pd
+import streamlit as st
+from pathlib import Path
+from utils.helpers import DATA_DIR, GEOJSON_PATH, file_signature, load_geojson
+
+# ==============================
+# Kanonikalisasi nama provinsi
+# ==============================
+# ID kanonik = kode BPS provinsi (properti `kode` di GeoJSON).
+ALIAS_PATH = DATA_DIR / "cache" / "provinsi_alias.json"
+
+SCORE_CUTOFF = 80
+AMBIGUITY_MARGIN = 3   # selisih skor top-2 (beda kode) di bawah ini dianggap ambigu
+
+# Alias tetap untuk ejaan yang tidak bisa dicocokkan persis dengan GeoJSON
+ALIAS_MANUAL = {
+    "ACEH": 11,
+    "NANGGROE ACEH DARUSSALAM": 11,
+    "KEPULAUAN BANGKA BELITUNG": 19,
+    "BABEL": 19,
+    "DI YOGYAKARTA": 34,
+    "DIY": 34,
+    "JAKARTA": 31,
+    "NUSA TENGGARA BARAT": 52,
+    "NTB": 52,
+    "NTT": 53,
+}
+
+_alias_lock = threading.Lock()
+
+def normalize_name(name: str) -> str:
+    """Huruf besar, tanpa tanda baca, spasi tunggal: 'DI. Aceh ' -> 'DI ACEH'"""
+    name = re.sub(r"[^\w\s]", " ", str(name).upper())
+    return re.sub(r"\s+", " ", name).strip()
+
+# ==============================
+# 1. Index alias (dibangun sekali, dipersist)
+# ==============================
+def _read_learned(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {k: int(v) for k, v in json.load(f).items()}
+
+def _write_learned(path: Path, learned: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(learned, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+@st.cache_resource(show_spinner=False)
+def _load_index(geojson_path: str, mtime_ns: int, digest: str) -> dict:
+    geojson = load_geojson(geojson_path)
+    canonical = {}
+    aliases = {}
+    for feature in geojson["features"]:
+        props = feature["properties"]
+        kode = int(props["kode"])
+        canonical[kode] = props["Propinsi"].strip().upper()
+        aliases[normalize_name(props["Propinsi"])] = kode
+    aliases.update(ALIAS_MANUAL)
+
+    # Alias hasil fuzzy sebelumnya; abaikan yang kodenya tidak ada di GeoJSON ini
+    learned = {k: v for k, v in _read_learned(ALIAS_PATH).items() if v in canonical}
+    aliases.update(learned)
+    # "unresolved": (nama, cutoff) yang gagal dicocokkan; tidak di-fuzzy & diperingatkan ulang
+    return {"canonical": canonical, "aliases": aliases, "learned": learned, "unresolved": set()}
+
+def province_index(geojson_path: Path = GEOJSON_PATH) -> dict:
+    """Index {'canonical': kode->nama GeoJSON, 'aliases': nama ternormalisasi->kode}"""
+    return _load_index(*file_signature(geojson_path))
+
+# ==============================
+# 2. Resolusi nama -> kode
+# ==============================
+def _fuzzy_resolve(norm: str, aliases: dict, score_cutoff: int):
+    # `aliases` = salinan privat (diambil di bawah _alias_lock), bukan dict bersama
+    from rapidfuzz import process   # hanya dibutuhkan untuk nama yang belum dikenal
+    candidates = process.extract(norm, list(aliases), limit=5)
+    if not candidates or candidates[0][1] < score_cutoff:
+        best = f" (terdekat: {candidates[0][0]}, skor {candidates[0][1]:.0f})" if candidates else ""
+        warnings.warn(f"Provinsi '{norm}' tidak cocok di atas cutoff {score_cutoff}{best}")
+        return None
+
+    best_name, best_score, _ = candidates[0]
+    best_kode = aliases[best_name]
+    for name, score, _ in candidates[1:]:
+        if aliases[name] != best_kode and best_score - score < AMBIGUITY_MARGIN:
+            warnings.warn(f"Provinsi '{norm}' ambigu: '{best_name}' ({best_score:.0f}) "
+                          f"vs '{name}' ({score:.0f})")
+            return None
+    return best_kode
+
+def resolve_provinsi(names, score_cutoff: int = SCORE_CUTOFF, geojson_path: Path = GEOJSON_PATH) -> list:
+    """Kode provinsi untuk tiap nama; fuzzy hanya untuk nama yang belum pernah dilihat
+    (berhasil maupun gagal)"""
+    index = province_index(geojson_path)
+    aliases = index["aliases"]
+    unresolved = index["unresolved"]
+
+    result = []
+    new_aliases = {}
+    new_unresolved = set()
+    snapshot = None
+    for name in names:
+        norm = normalize_name(name)
+        kode = aliases.get(norm, new_aliases.get(norm))
+        key = (norm, score_cutoff)
+        if kode is None and key not in unresolved and key not in new_unresolved:
+            if snapshot is None:
+                with _alias_lock:
+                    snapshot = dict(aliases)
+            kode = _fuzzy_resolve(norm, snapshot, score_cutoff)
+            if kode is not None:
+                new_aliases[norm] = kode
+            else:
+                new_unresolved.add(key)
+        result.append(kode)
+
+    if new_aliases or new_unresolved:
+        with _alias_lock:
+            if new_aliases:
+                aliases.update(new_aliases)
+                index["learned"].update(new_aliases)
+                # Alias baru bisa mengubah hasil fuzzy: nama yang gagal dicoba lagi
+                unresolved.clear()
+                _write_learned(ALIAS_PATH, index["learned"])
+            unresolved.update(new_unresolved)
+    return result
+
+def add_kode_provinsi(df: pd.DataFrame, col: str = "Provinsi") -> pd.DataFrame:
+    """Salinan df dengan kolom `Kode_Provinsi` (Int64, <NA> jika tidak terpetakan)"""
+    df = df.copy()
+    unique_names = df[col].dropna().unique()
+    mapping = dict(zip(unique_names, resolve_provinsi(unique_names)))
+    df["Kode_Provinsi"] = df[col].map(mapping).astype("Int64")
+    return df
@@ -0,0 +1,253 @@
+# utils/registry.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+if __name__ == "__main__":
+    # CLI tanpa runtime Streamlit: sembunyikan peringatan "No runtime found" saat import
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+
+from utils.helpers import (DATA_DIR, DF_LATIH_PATH, MODEL_PATH, METRICS_PATH, features, input_ranges,
+                           load_csv, load_json)
+
+# ==============================
+# Registry model di disk
+# ==============================
+# data/models/
+#   active.json              {"version": "v2"}  -> versi yang dipakai app/api/score
+#   v1/model.pkl             artefak sklearn
+#   v1/meta.json             fitur, range data latih, catatan, waktu dibuat
+#   v1/metrics.json          metrik evaluasi (format sama dengan eval_metrics.json)
+#   v1/df_latih.csv          data latih versi ini (opsional; statistik drift), default data/df_latih.csv
+# Tanpa registry, data/rf_augmentasi.pkl + eval_metrics.json dipakai sebagai versi "legacy".
+# Ganti versi = tulis ulang active.json secara atomik; semua cache dikunci isi file
+# model, jadi rerun berikutnya langsung memakai versi baru tanpa restart.
+REGISTRY_DIR = DATA_DIR / "models"
+ACTIVE_PATH = REGISTRY_DIR / "active.json"
+LEGACY_VERSION = "legacy"
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """Metadata satu versi model; model sendiri baru dimuat saat dipakai (lihat load_compiled_model)"""
+    version: str
+    model_path: Path
+    metrics_path: Path
+    features: tuple
+    input_ranges: dict = field(compare=False)
+    created: str = ""
+    notes: str = ""
+    # Split train/test saat training ({"test_indices": [...]} atau {"test_size", "random_state"});
+    # None = tidak tercatat, metrik train/test diambil dari metrics.json
+    split: dict = field(default=None, compare=False)
+    # CSV data latih (sebaran untuk PSI/KS); range ekstrapolasi tetap dari input_ranges
+    training_data: Path = DF_LATIH_PATH
+
+    def metrics(self) -> dict:
+        """Metrik evaluasi versi ini ({} jika belum ada)"""
+        if not self.metrics_path.exists():
+            return {}
+        return load_json(self.metrics_path)
+
+def _legacy_version() -> ModelVersion:
+    return ModelVersion(
+        version=LEGACY_VERSION,
+        model_path=MODEL_PATH,
+        metrics_path=METRICS_PATH,
+        features=tuple(features),
+        input_ranges=dict(input_ranges),
+        notes="data/rf_augmentasi.pkl (di luar registry)",
+    )
+
+# ==============================
+# 1. Baca registry
+# ==============================
+def list_versions() -> list:
+    """Nama versi yang bisa dipakai, urut waktu dibuat.
+
+    "legacy" ikut di depan selama data/rf_augmentasi.pkl ada (atau registry kosong),
+    sama dengan fallback get_version, jadi semua versi yang bisa diaktifkan tampil di sini.
+    """
+    versions = []
+    if REGISTRY_DIR.exists():
+        versions = [p.parent.name for p in REGISTRY_DIR.glob("*/meta.json")]
+    versions = sorted(versions, key=lambda name: (get_version(name).created, name))
+    if LEGACY_VERSION not in versions and (MODEL_PATH.exists() or not versions):
+        versions.insert(0, LEGACY_VERSION)
+    return versions
+
+def get_version(name: str) -> ModelVersion:
+    """Metadata satu versi (meta.json di-cache per isi file)"""
+    if name == LEGACY_VERSION and not (REGISTRY_DIR / name / "meta.json").exists():
+        return _legacy_version()
+    version_dir = REGISTRY_DIR / name
+    meta_path = version_dir / "meta.json"
+    if not meta_path.exists():
+        raise KeyError(f"Versi model tidak ditemukan di registry: {name}")
+    meta = load_json(meta_path)
+    training_data = version_dir / "df_latih.csv"
+    return ModelVersion(
+        version=name,
+        model_path=version_dir / "model.pkl",
+        metrics_path=version_dir / "metrics.json",
+        features=tuple(meta["features"]),
+        input_ranges={col: tuple(bounds) for col, bounds in meta["input_ranges"].items()},
+        created=meta.get("created", ""),
+        notes=meta.get("notes", ""),
+        split=meta.get("split"),
+        training_data=training_data if training_data.exists() else DF_LATIH_PATH,
+    )
+
+def active_version() -> str:
+    """Versi aktif: isi active.json; tanpa pointer "legacy" (versi pertama di list_versions).
+
+    Mendaftarkan versi baru tidak pernah mengganti versi yang dilayani, hanya activate().
+    """
+    if ACTIVE_PATH.exists():
+        return load_json(ACTIVE_PATH)["version"]
+    return list_versions()[0]
+
+def active_model() -> ModelVersion:
+    return get_version(active_version())
+
+def active_model_path() -> Path:
+    return active_model().model_path
+
+# ==============================
+# 2. Tulis registry (atomik)
+# ==============================
+def _write_json_atomic(path: Path, data: dict):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+def activate(name: str):
+    """Jadikan `name` versi aktif (satu os.replace: pembaca melihat versi lama atau baru, tidak pernah setengah)"""
+    if name not in list_versions():
+        raise KeyError(f"Versi model tidak ditemukan di registry: {name}")
+    REGISTRY_DIR.mkdir(parents=True, exist_ok=True)
+    _write_json_atomic(ACTIVE_PATH, {"version": name, "activated": time.strftime("%Y-%m-%dT%H:%M:%S")})
+
+def ranges_from_training(path: Path) -> dict:
+    """Range (min, maks) tiap fitur dari CSV data latih, untuk peringatan ekstrapolasi"""
+    df = load_csv(path)
+    return {col: (float(df[col].min()), float(df[col].max())) for col in features}
+
+def register(model_file: Path, version: str = None, metrics_file: Path = None,
+             ranges: dict = None, notes: str = "", make_active: bool = False,
+             split: dict = None, training_file: Path = None) -> ModelVersion:
+    """Salin model (+ metrik, + data latih) ke registry sebagai versi baru.
+
+    `training_file` = CSV data latih; ikut disalin (statistik drift) dan, tanpa `ranges`,
+    menjadi sumber range fitur. `split` = split train/test yang dipakai saat training.
+    Tanpa `metrics_file`, metrik dihitung langsung (utils.evaluation) dan ditulis ke
+    metrics.json; train/test hanya terisi jika `split` diberikan.
+    """
+    import joblib
+
+    version = version or time.strftime("v%Y%m%d-%H%M%S")
+    if version == LEGACY_VERSION or "/" in version or version.startswith("."):
+        raise ValueError(f"Nama versi tidak valid: {version}")
+    version_dir = REGISTRY_DIR / version
+    if version_dir.exists():
+        raise FileExistsError(f"Versi sudah ada di registry: {version}")
+
+    # Dashboard & API hanya punya input untuk `features`
+    model = joblib.load(model_file)
+    model_features = [str(f) for f in getattr(model, "feature_names_in_", features)]
+    if model_features != features:
+        raise ValueError(f"Fitur model {model_features} tidak sama dengan fitur dashboard {features}")
+
+    if ranges is None and training_file is not None:
+        ranges = ranges_from_training(training_file)
+    meta = {
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "features": features,
+        "input_ranges": {col: list(bounds) for col, bounds in (ranges or input_ranges).items()},
+        "notes": notes,
+        "source": str(model_file),
+    }
+    if split:
+        meta["split"] = split
+    # Registrasi pertama: kunci versi yang sedang dilayani di active.json (tanpa model
+    # legacy, versi baru ini satu-satunya pilihan)
+    served = None
+    if not ACTIVE_PATH.exists():
+        served = active_version() if MODEL_PATH.exists() else version
+    REGISTRY_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_dir = REGISTRY_DIR / f".{version}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    shutil.copy2(model_file, tmp_dir / "model.pkl")
+    if metrics_file is not None:
+        shutil.copy2(metrics_file, tmp_dir / "metrics.json")
+    if training_file is not None:
+        shutil.copy2(training_file, tmp_dir / "df_latih.csv")
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    os.replace(tmp_dir, version_dir)
+
+    if metrics_file is None:
+        from utils.evaluation import evaluate, write_metrics
+        write_metrics(evaluate(get_version(version)), version_dir / "metrics.json")
+    if make_active:
+        activate(version)
+    elif served is not None and not ACTIVE_PATH.exists():
+        activate(served)
+    return get_version(version)
+
+# ==============================
+# 3. CLI
+# ==============================
+#   python -m utils.registry list
+#   python -m utils.registry register model_baru.pkl --version v2 --metrics eval_v2.json \
+#       --ranges-from data/df_latih.csv --activate
+#   python -m utils.registry activate v1
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Registry model IKU")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="daftar versi")
+    reg = sub.add_parser("register", help="daftarkan model baru")
+    reg.add_argument("model", type=Path)
+    reg.add_argument("--version", default=None)
+    reg.add_argument("--metrics", type=Path, default=None, help="JSON metrik (format eval_metrics.json)")
+    reg.add_argument("--ranges-from", type=Path, default=None,
+                     help="CSV data latih (range fitur & statistik drift versi ini)")
+    reg.add_argument("--notes", default="")
+    reg.add_argument("--test-size", type=float, default=None,
+                     help="split training: proporsi test (bersama --random-state)")
+    reg.add_argument("--random-state", type=int, default=None, help="split training: seed train_test_split")
+    reg.add_argument("--test-indices", type=Path, default=None,
+                     help="split training: JSON list indeks baris test df_latih")
+    reg.add_argument("--activate", action="store_true")
+    act = sub.add_parser("activate", help="ganti versi aktif")
+    act.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "register":
+        split = None
+        if args.test_indices:
+            split = {"test_indices": json.loads(args.test_indices.read_text(encoding="utf-8"))}
+        elif args.test_size is not None and args.random_state is not None:
+            split = {"test_size": args.test_size, "random_state": args.random_state}
+        mv = register(args.model, args.version, args.metrics, None, args.notes, args.activate, split,
+                      args.ranges_from)
+        print(f"Terdaftar: {mv.version} ({mv.model_path})")
+    elif args.command == "activate":
+        activate(args.version)
+        print(f"Versi aktif: {args.version}")
+    active = active_version()
+    for name in list_versions():
+        mv = get_version(name)
+        print(f"{'*' if name == active else ' '} {name:<20} {mv.created:<20} {mv.notes}")
+
+if __name__ == "__main__":
+    main()
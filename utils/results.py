@@ -0,0 +1,82 @@
+# utils/results.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import hashlib
+import numpy as np
+import pandas as pd
+import streamlit as st
+from dataclasses import dataclass, field
+from pathlib import Path
+from utils.helpers import (DF_HOT_PATH, file_signature, resolve_model_path, load_compiled_model, load_hot,
+                           rf_predict_interval_batch, iku_categories)
+from utils.perf import timed, cache_miss
+from utils.provinsi import add_kode_provinsi
+
+# ==============================
+# Hasil turunan (read-only, dipakai bersama antar sesi)
+# ==============================
+@dataclass(frozen=True)
+class HotResults:
+    """Prediksi (+ interval antar pohon), kategori dan kode provinsi untuk df_hot
+    pada satu versi model+data.
+
+    Objek ini dibagi ke semua sesi Streamlit: array-nya read-only dan DataFrame
+    cache-nya privat; `frame()` memberi salinan yang bebas diubah per sesi.
+    """
+    version: str
+    prediksi: np.ndarray
+    bawah: np.ndarray
+    atas: np.ndarray
+    kategori: np.ndarray
+    kode_provinsi: np.ndarray
+    _frame: pd.DataFrame = field(repr=False)
+
+    def frame(self) -> pd.DataFrame:
+        """Salinan df_hot + kolom prediksi/kategori"""
+        return self._frame.copy()
+
+    def row(self, provinsi: str) -> pd.Series:
+        return self._frame.loc[self._frame["Provinsi"] == provinsi].iloc[0].copy()
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr = np.array(arr, copy=True)
+    arr.flags.writeable = False
+    return arr
+
+def model_data_version(*paths: Path) -> str:
+    """Versi gabungan dari isi file model & data (sha256 tiap file)"""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(file_signature(path)[2].encode())
+    return h.hexdigest()[:16]
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+@cache_miss
+def _hot_results_cached(version: str, model_path: str, hot_path: str) -> HotResults:
+    df = add_kode_provinsi(load_hot(hot_path))
+    interval = rf_predict_interval_batch(df, load_compiled_model(model_path))
+    prediksi = interval["prediksi"]
+    kategori = iku_categories(prediksi)
+
+    df["Prediksi_IKU"] = prediksi
+    df["Prediksi_Std"] = interval["std"]
+    df["Prediksi_Bawah"] = interval["bawah"]
+    df["Prediksi_Atas"] = interval["atas"]
+    df["Kategori"] = kategori
+    return HotResults(
+        version=version,
+        prediksi=_readonly(prediksi),
+        bawah=_readonly(interval["bawah"]),
+        atas=_readonly(interval["atas"]),
+        kategori=_readonly(np.asarray(kategori, dtype=object)),
+        kode_provinsi=_readonly(df["Kode_Provinsi"].to_numpy(dtype="float64", na_value=np.nan)),
+        _frame=df,
+    )
+
+@timed("hot_results", cached=True)
+def hot_results(model_path: Path = None, hot_path: Path = DF_HOT_PATH) -> HotResults:
+    """Hasil prediksi + interval df_hot, dihitung sekali per versi model+data"""
+    model_path = resolve_model_path(model_path)
+    version = model_data_version(model_path, hot_path)
+    return _hot_results_cached(version, str(model_path), str(hot_path))
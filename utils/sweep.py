@@ -0,0 +1,64 @@
+# utils/sweep.py
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+import streamlit as st
+from pathlib import Path
+from utils.helpers import (features, file_signature, active_input_ranges, load_compiled_model,
+                           resolve_model_path, iku_categories)
+
+# ==============================
+# Simulasi what-if: skor grid fitur dalam satu panggilan batch
+# ==============================
+MAX_GRID_POINTS = 250_000
+
+def grid_axis(feature: str, n: int, lo: float = None, hi: float = None, ranges: dict = None) -> tuple:
+    """Spesifikasi sumbu (fitur, lo, hi, n); default mengikuti range data latih model aktif"""
+    default_lo, default_hi = (active_input_ranges() if ranges is None else ranges)[feature]
+    return (feature, float(default_lo if lo is None else lo),
+            float(default_hi if hi is None else hi), int(n))
+
+def build_grid(fixed: dict, axes: tuple) -> tuple:
+    """Matriks fitur (n_points, n_features) + nilai tiap sumbu.
+
+    Fitur yang tidak disapu memakai nilai di `fixed`.
+    """
+    if not 1 <= len(axes) <= 2:
+        raise ValueError("Sweep mendukung 1 atau 2 fitur")
+    if len({a[0] for a in axes}) != len(axes):
+        raise ValueError("Fitur sweep harus berbeda")
+
+    values = [np.linspace(lo, hi, n) for _, lo, hi, n in axes]
+    n_points = int(np.prod([len(v) for v in values]))
+    if n_points > MAX_GRID_POINTS:
+        raise ValueError(f"Grid terlalu besar ({n_points} titik, maks {MAX_GRID_POINTS})")
+
+    X = np.tile(np.array([fixed[col] for col in features], dtype=np.float64), (n_points, 1))
+    mesh = np.meshgrid(*values, indexing="ij")
+    for (feature, *_), m in zip(axes, mesh):
+        X[:, features.index(feature)] = m.ravel()
+    return X, values
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _sweep_cached(model_version: str, fixed_items: tuple, axes: tuple, model_path: str) -> dict:
+    X, values = build_grid(dict(fixed_items), axes)
+    pred = load_compiled_model(Path(model_path)).predict(X)
+    shape = tuple(len(v) for v in values)
+    return {
+        "axes": axes,
+        "values": values,
+        "prediksi": pred.reshape(shape),
+        "kategori": np.asarray(iku_categories(pred), dtype=object).reshape(shape),
+    }
+
+def sweep(fixed: dict, axes: tuple, model_path: Path = None) -> dict:
+    """Prediksi IKU di seluruh grid, di-cache per (versi model, nilai tetap, spesifikasi grid).
+
+    Hasil: dict dengan `values` (list array per sumbu), `prediksi` dan `kategori`
+    berbentuk grid (n1,) atau (n1, n2).
+    """
+    model_path = resolve_model_path(model_path)
+    model_version = file_signature(model_path)[2]
+    fixed_items = tuple((col, float(fixed[col])) for col in features)
+    return _sweep_cached(model_version, fixed_items, tuple(axes), str(model_path))